@@ -1,35 +1,74 @@
 """The Ujin Smart Home integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_EMAIL, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.event import (
+    async_track_time_change,
+    async_track_time_interval,
+)
 
-from .api import TokenExpiredError, UjinApiClient
-from .const import DOMAIN
+from .api import TokenExpiredError, UjinApiClient, UjinApiError
+from .const import (
+    CONF_API_HOST,
+    CONF_API_HOSTS,
+    CONF_FAST_INTERVAL,
+    CONF_LOCAL_CONTROL,
+    CONF_NORMAL_INTERVAL,
+    CONF_PARSE_THRESHOLD,
+    CONF_RATE_BURST,
+    CONF_RATE_LIMIT,
+    CONF_SLOW_INTERVAL,
+    CONF_STALE_BUDGET,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_LOCAL_CONTROL,
+    DEFAULT_NORMAL_INTERVAL,
+    DEFAULT_PARSE_THRESHOLD,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_SLOW_INTERVAL,
+    DEFAULT_STALE_BUDGET,
+    DOMAIN,
+    GEO_REPROBE_INTERVAL,
+    TELEMETRY_IMPORT_MINUTE,
+    TIER_FAST,
+    TIER_NORMAL,
+    TIER_SLOW,
+)
+from .coordinator import UjinAutoscriptCoordinator, UjinDataUpdateCoordinator
+from .hub import async_get_hub
+from .services import async_setup_services
+from .telemetry import previous_hour
 from .websocket import UjinWebSocketClient
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [
+    Platform.BINARY_SENSOR,
+    Platform.SCENE,
+    Platform.SENSOR,
     Platform.SWITCH,
 ]
 
-SCAN_INTERVAL = timedelta(seconds=30)
-
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Ujin from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
+    hub = async_get_hub(hass)
 
-    # Create API client
+    # Create API client on the connection pool shared by all entries
     api_client = UjinApiClient(
         email=entry.data[CONF_EMAIL],
-        session=None,  # Will be created by the client
+        session=hub.session,
+        rate_limit=entry.options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+        rate_burst=entry.options.get(CONF_RATE_BURST, DEFAULT_RATE_BURST),
+        parse_threshold=_parse_threshold(entry),
+        local_control=entry.options.get(CONF_LOCAL_CONTROL, DEFAULT_LOCAL_CONTROL),
     )
 
     # Restore token, user_token and area_guid from saved data
@@ -45,100 +84,188 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         api_client._area_guid = entry.data["area_guid"]
         _LOGGER.info("Restored area_guid: %s", entry.data["area_guid"])
 
+    # Use the API host cached in the entry, resolve it via geo service otherwise
+    if entry.data.get(CONF_API_HOSTS):
+        api_client.set_api_hosts(entry.data[CONF_API_HOSTS], entry.data.get(CONF_API_HOST))
+    else:
+        await api_client.select_api_host()
+        _async_save_api_hosts(hass, entry, api_client)
+    _LOGGER.info("Using API host %s", api_client.base_url)
+
     # Validate token by fetching devices
     try:
         _LOGGER.info("Validating token for %s", entry.data[CONF_EMAIL])
         devices = await api_client.get_devices()
         if not devices:
             _LOGGER.warning("No devices found, but token seems valid")
-    except Exception as err:
+    except TokenExpiredError as err:
         _LOGGER.error("Failed to validate token: %s", err)
-        # Token might be expired, user needs to re-configure
-        from .api import TokenExpiredError
-        if isinstance(err, TokenExpiredError):
-            _LOGGER.error(
-                "Token expired for %s. Please reconfigure the integration.",
-                entry.data[CONF_EMAIL]
-            )
-            # The integration will continue but coordinator will fail
-            # User will see "Unavailable" status
+        # Token expired, user needs to re-configure
+        _LOGGER.error(
+            "Token expired for %s. Please reconfigure the integration.",
+            entry.data[CONF_EMAIL]
+        )
         return False
+    except UjinApiError as err:
+        # Cloud outage, let Home Assistant retry the setup later
+        raise ConfigEntryNotReady(f"Ujin API unavailable: {err}") from err
 
-    # Create coordinator
-    async def async_update_data():
-        """Fetch data from API."""
-        try:
-            devices = await api_client.get_devices()
-            _LOGGER.debug("Fetched %d devices from Ujin API", len(devices))
-            return devices
-        except TokenExpiredError as err:
-            _LOGGER.error("Token expired: %s", err)
-            raise UpdateFailed(
-                "Token expired. Please reconfigure the integration."
-            ) from err
-        except Exception as err:
-            _LOGGER.error("Error communicating with API: %s", err)
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
-
-    coordinator = DataUpdateCoordinator(
+    # Create coordinator, polling is driven by the tier coordinators
+    coordinator = UjinDataUpdateCoordinator(
         hass,
-        _LOGGER,
-        name=DOMAIN,
-        update_method=async_update_data,
-        update_interval=SCAN_INTERVAL,
+        api_client,
+        stale_budget=entry.options.get(CONF_STALE_BUDGET, DEFAULT_STALE_BUDGET),
+        update_interval=None,
     )
 
     # Fetch initial data
     await coordinator.async_config_entry_first_refresh()
 
+    # Autoscripts are optional, setup goes on if the list is unavailable.
+    # Fetched together with the WebSocket URL, the requests are independent
+    autoscript_coordinator = UjinAutoscriptCoordinator(hass, api_client)
+    _, wss_url = await asyncio.gather(
+        autoscript_coordinator.async_refresh(),
+        api_client.get_websocket_url(),
+    )
+
     # Setup WebSocket for real-time updates
     websocket_client = None
     try:
-        wss_url = await api_client.get_websocket_url()
         if wss_url:
-            def handle_websocket_message(data: dict) -> None:
-                """Handle incoming WebSocket message."""
-                try:
-                    # WebSocket messages contain device updates
-                    # Update coordinator data without API call
-                    if "data" in data:
-                        # Parse device updates from WebSocket message
-                        # This will be called from async context, safe to update coordinator
-                        hass.async_create_task(coordinator.async_request_refresh())
-                except Exception as err:
-                    _LOGGER.error("Error handling WebSocket message: %s", err)
-
-            websocket_client = UjinWebSocketClient(
-                url=wss_url,
-                on_message=handle_websocket_message,
+            # Connects, or joins a connection to the same URL
+            websocket_client = await hub.async_subscribe_websocket(
+                entry.entry_id, wss_url, coordinator.handle_websocket_message
             )
-            # Connect to WebSocket
-            await websocket_client.connect()
             _LOGGER.info("WebSocket real-time updates enabled")
         else:
             _LOGGER.warning("WebSocket URL not available, using polling only")
     except Exception as err:
         _LOGGER.error("Failed to setup WebSocket: %s. Falling back to polling.", err)
 
-    hass.data[DOMAIN][entry.entry_id] = {
+    # Offset the first polls so entries don't poll in lockstep
+    intervals = _tier_intervals(entry, websocket_client)
+    coordinator.min_cloud_interval = intervals[TIER_NORMAL]
+    entry.async_on_unload(
+        coordinator.async_setup_tiers(
+            intervals,
+            {
+                tier: hub.poll_delay(entry.entry_id, interval.total_seconds())
+                for tier, interval in intervals.items()
+            },
+        )
+    )
+
+    hub.entries[entry.entry_id] = {
         "api": api_client,
         "coordinator": coordinator,
+        "autoscripts": autoscript_coordinator,
         "websocket": websocket_client,
     }
 
+    # Periodically re-probe API hosts to return to the fastest one
+    async def async_reprobe_hosts(now) -> None:
+        """Re-probe API hosts and remember the selected one."""
+        if len(api_client.hosts) < 2:
+            return
+        await api_client.probe_hosts()
+        _async_save_api_hosts(hass, entry, api_client)
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, async_reprobe_hosts, timedelta(seconds=GEO_REPROBE_INTERVAL)
+        )
+    )
+
+    # Import the last hour of telemetry into long-term statistics
+    async def async_import_telemetry(now) -> None:
+        """Aggregate the previous hour of device telemetry."""
+        await coordinator.telemetry.async_import_statistics(hass, previous_hour(now))
+
+    entry.async_on_unload(
+        async_track_time_change(
+            hass, async_import_telemetry, minute=TELEMETRY_IMPORT_MINUTE, second=0
+        )
+    )
+
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    async_setup_services(hass)
+
     # Setup platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options without reloading the entry."""
+    entry_data = hass.data[DOMAIN].entries[entry.entry_id]
+    entry_data["api"].rate_limiter.configure(
+        entry.options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+        entry.options.get(CONF_RATE_BURST, DEFAULT_RATE_BURST),
+    )
+    entry_data["api"].parse_threshold = _parse_threshold(entry)
+    entry_data["api"].local_control = entry.options.get(
+        CONF_LOCAL_CONTROL, DEFAULT_LOCAL_CONTROL
+    )
+    coordinator = entry_data["coordinator"]
+    coordinator.cache.stale_budget = timedelta(
+        seconds=entry.options.get(CONF_STALE_BUDGET, DEFAULT_STALE_BUDGET)
+    )
+    intervals = _tier_intervals(entry, entry_data["websocket"])
+    coordinator.min_cloud_interval = intervals[TIER_NORMAL]
+    for tier, tier_coordinator in coordinator.tiers.items():
+        tier_coordinator.update_interval = intervals[tier]
+
+
+def _parse_threshold(entry: ConfigEntry) -> int:
+    """Return the size above which responses are parsed in the executor."""
+    return entry.options.get(CONF_PARSE_THRESHOLD, DEFAULT_PARSE_THRESHOLD) * 1024
+
+
+def _tier_intervals(
+    entry: ConfigEntry, websocket_client: UjinWebSocketClient | None
+) -> dict[str, timedelta]:
+    """Return the polling interval of each tier."""
+    normal = entry.options.get(CONF_NORMAL_INTERVAL, DEFAULT_NORMAL_INTERVAL)
+    slow = entry.options.get(CONF_SLOW_INTERVAL, DEFAULT_SLOW_INTERVAL)
+    if websocket_client is None:
+        # Relays only poll slowly because changes are pushed
+        slow = normal
+    return {
+        TIER_FAST: timedelta(
+            seconds=entry.options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL)
+        ),
+        TIER_NORMAL: timedelta(seconds=normal),
+        TIER_SLOW: timedelta(seconds=slow),
+    }
+
+
+@callback
+def _async_save_api_hosts(
+    hass: HomeAssistant, entry: ConfigEntry, api_client: UjinApiClient
+) -> None:
+    """Cache the selected API host in the config entry."""
+    if (
+        entry.data.get(CONF_API_HOST) == api_client.base_url
+        and entry.data.get(CONF_API_HOSTS) == api_client.hosts
+    ):
+        return
+    hass.config_entries.async_update_entry(
+        entry,
+        data={
+            **entry.data,
+            CONF_API_HOST: api_client.base_url,
+            CONF_API_HOSTS: api_client.hosts,
+        },
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        # Disconnect WebSocket if active
-        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
-        if websocket_client := entry_data.get("websocket"):
-            await websocket_client.disconnect()
-            _LOGGER.info("WebSocket disconnected")
+        # Disconnect WebSocket unless other entries still use it
+        await hass.data[DOMAIN].async_unload_entry(entry.entry_id)
 
     return unload_ok
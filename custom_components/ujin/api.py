@@ -2,36 +2,142 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable, Mapping
+import hashlib
 import logging
+import time
+from types import MappingProxyType
 from typing import Any
 
 import aiohttp
 
 from .const import (
+    API_APP_INIT,
     API_APP_PARAM,
     API_AUTH_EMAIL_SEND,
     API_AUTH_EMAIL_VERIFY,
     API_AUTH_USER,
+    API_AUTOSCRIPTS_LIST,
+    API_AUTOSCRIPTS_RUN,
     API_BASE_URL,
     API_DEVICES_MAIN,
     API_DEVICES_WSS,
+    API_GEO_URL,
     API_PLATFORM_PARAM,
     API_PROFILE_OBJECTS,
     API_SEND_SIGNAL,
+    DEFAULT_LOCAL_CONTROL,
+    DEFAULT_PARSE_THRESHOLD,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    GEO_PROBE_TIMEOUT,
     HEADER_APP_LANG,
     HEADER_APP_PLATFORM,
     HEADER_APP_TYPE,
     HEADER_APP_VERSION,
+    HOST_FAILURE_THRESHOLD,
+    HOST_SLOW_THRESHOLD,
+    LOCAL_FAILURE_THRESHOLD,
+    LOCAL_RETRY_AFTER,
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    PRIORITY_REFRESH,
+    REQUEST_TIMEOUT,
+    ROUTE_CLOUD,
+    ROUTE_LOCAL,
 )
+from .local import LocalTransportError, UjinLocalClient, get_local_endpoint
+from .metrics import ParseMetrics, RequestMetrics, SnapshotMetrics
+from .ratelimit import UjinRateLimiter
+from .traffic import UjinTrafficRecorder
+
+try:
+    # Bundled with Home Assistant, several times faster on large payloads
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 _LOGGER = logging.getLogger(__name__)
 
+# Channels of a devices/main response, shared by every consumer
+DeviceSnapshot = tuple[Mapping[str, Any], ...]
+
 
 class TokenExpiredError(Exception):
     """Exception raised when API token has expired."""
     pass
 
 
+class UjinApiError(Exception):
+    """Exception raised when the Ujin API cannot be reached or fails."""
+    pass
+
+
+def _parse_geo_hosts(data: Any) -> list[str]:
+    """Extract API base URLs from a geo service response.
+
+    Tokens travel in query strings, so hosts are only ever used over https:
+    http:// entries are upgraded and other schemes are dropped.
+    """
+    payload = data.get("data", data) if isinstance(data, dict) else data
+    if isinstance(payload, dict):
+        payload = (
+            payload.get("hosts")
+            or payload.get("api")
+            or payload.get("url")
+            or payload.get("host")
+        )
+
+    hosts = []
+    for item in payload if isinstance(payload, list) else [payload]:
+        if isinstance(item, dict):
+            item = item.get("url") or item.get("host") or item.get("api")
+        if isinstance(item, str) and item:
+            scheme, sep, rest = item.partition("://")
+            if not sep:
+                item = f"https://{item}"
+            elif scheme.lower() == "http":
+                item = f"https://{rest}"
+            elif scheme.lower() != "https":
+                _LOGGER.warning("Ignoring geo host with unsupported scheme: %s", item)
+                continue
+            hosts.append(item.rstrip("/"))
+    return hosts
+
+
+def body_digest(body: bytes) -> bytes:
+    """Return the hash identifying a response body."""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+def parse_devices_main(
+    body: bytes,
+) -> tuple[Any, DeviceSnapshot | None, dict[str, dict[str, Any]]]:
+    """Decode a devices/main response and flatten its total_list.
+
+    Safe to run outside the event loop. Returns the decoded response and,
+    if it reports success, the channels as an immutable snapshot and the
+    local endpoints by device id.
+    """
+    data = json_loads(body)
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug("API Response: %s", data)
+    if not isinstance(data, dict) or data.get("error") != 0:
+        return data, None, {}
+
+    # Extract devices from the total_list structure
+    devices: list[Mapping[str, Any]] = []
+    endpoints: dict[str, dict[str, Any]] = {}
+    for device_group in data.get("data", {}).get("devices", []):
+        if device_group.get("type") != "total_list":
+            continue
+        for device in device_group.get("data", []):
+            devices.append(MappingProxyType(device))
+            if endpoint := get_local_endpoint(device):
+                endpoints[device["id"]] = endpoint
+    return data, tuple(devices), endpoints
+
+
 class UjinApiClient:
     """Ujin API Client."""
 
@@ -39,14 +145,49 @@ class UjinApiClient:
         self,
         email: str,
         session: aiohttp.ClientSession | None = None,
+        base_url: str | None = None,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        rate_burst: int = DEFAULT_RATE_BURST,
+        parse_threshold: int = DEFAULT_PARSE_THRESHOLD * 1024,
+        local_control: bool = DEFAULT_LOCAL_CONTROL,
     ) -> None:
-        """Initialize the API client."""
+        """Initialize the API client.
+
+        Args:
+            parse_threshold: devices/main responses larger than this many
+                bytes are decoded in the executor, 0 = always
+            local_control: talk to devices over the LAN when they advertise
+                a local endpoint, False = cloud only
+        """
         self.email = email
         self._session = session
+        self._owns_session = session is None
         self._token: str | None = None  # Main auth token
         self._user_token: str | None = None  # Apartment-specific token
         self._area_guid: str | None = None
-        self._base_url = API_BASE_URL
+        self._base_url = base_url or API_BASE_URL
+        # Candidate API hosts, best first, and health of the current one
+        self._hosts: list[str] = [self._base_url]
+        self._host_failures = 0
+        # Shared request budget for this account
+        self.rate_limiter = UjinRateLimiter(rate_limit, rate_burst)
+        # Per-endpoint request count, errors and latency
+        self.metrics = RequestMetrics()
+        # Set while a traffic capture is running
+        self.recorder: UjinTrafficRecorder | None = None
+        self._local = UjinLocalClient()
+        self.local_control = local_control
+        # Local endpoints by device id, refreshed on every get_devices
+        self._local_endpoints: dict[str, dict[str, Any]] = {}
+        # Per-device routing statistics and local fallback state
+        self._route_stats: dict[str, dict[str, Any]] = {}
+        # Last parsed devices/main response, with its body hash and ETag
+        self._devices_snapshot: DeviceSnapshot | None = None
+        self._devices_digest: bytes | None = None
+        self._devices_etag: str | None = None
+        self.snapshot_metrics = SnapshotMetrics()
+        self.parse_threshold = parse_threshold
+        self.parse_metrics = ParseMetrics()
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
@@ -54,12 +195,215 @@ class UjinApiClient:
             self._session = aiohttp.ClientSession()
         return self._session
 
-    async def send_auth_code(self) -> dict[str, Any]:
-        """Send authentication code to email."""
+    @property
+    def base_url(self) -> str:
+        """Return the API host currently in use."""
+        return self._base_url
+
+    @property
+    def hosts(self) -> list[str]:
+        """Return the candidate API hosts, best first."""
+        return list(self._hosts)
+
+    def set_api_hosts(self, hosts: list[str], current: str | None = None) -> None:
+        """Restore candidate hosts (best first) and the host in use."""
+        if not hosts:
+            return
+        self._hosts = list(hosts)
+        self._base_url = current if current in self._hosts else self._hosts[0]
+        self._host_failures = 0
+
+    async def resolve_hosts(self) -> list[str]:
+        """Resolve region-appropriate API hosts through the geo service."""
+        session = await self._get_session()
+        hosts: list[str] = []
+
+        try:
+            params = {
+                "app": API_APP_PARAM,
+                "platform": API_PLATFORM_PARAM,
+            }
+            async with session.get(
+                API_GEO_URL,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=GEO_PROBE_TIMEOUT),
+            ) as response:
+                data = await response.json(content_type=None)
+                _LOGGER.debug("Geo service response: %s", data)
+                hosts = _parse_geo_hosts(data)
+        except Exception as err:
+            _LOGGER.warning("Failed to resolve API hosts via geo service: %s", err)
+
+        # The default host stays available as a last resort
+        if API_BASE_URL not in hosts:
+            hosts.append(API_BASE_URL)
+
+        _LOGGER.info("Resolved API host(s): %s", hosts)
+        return hosts
+
+    async def _probe_host(self, host: str) -> float | None:
+        """Measure the response time of an API host, None if unreachable."""
+        session = await self._get_session()
+        start = time.monotonic()
+
+        try:
+            async with session.get(
+                f"{host}{API_APP_INIT}",
+                params={"app": API_APP_PARAM, "platform": API_PLATFORM_PARAM},
+                timeout=aiohttp.ClientTimeout(total=GEO_PROBE_TIMEOUT),
+            ) as response:
+                await response.read()
+                if response.status >= 500:
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Probe of %s failed: %s", host, err)
+            return None
+
+        return time.monotonic() - start
+
+    async def probe_hosts(self, hosts: list[str] | None = None) -> dict[str, float | None]:
+        """Probe candidate hosts and switch to the lowest-latency one.
+
+        Returns the measured latency per host (None if unreachable).
+        """
+        hosts = hosts or self._hosts
+        results = await asyncio.gather(*(self._probe_host(host) for host in hosts))
+        latencies = dict(zip(hosts, results))
+
+        reachable = sorted(
+            (host for host in hosts if latencies[host] is not None),
+            key=lambda host: latencies[host],
+        )
+        if not reachable:
+            _LOGGER.warning("No API host answered the probe, keeping %s", self._base_url)
+            return latencies
+
+        self._hosts = reachable + [host for host in hosts if host not in reachable]
+        if self._base_url != reachable[0]:
+            _LOGGER.info(
+                "Switching API host from %s to %s (%.0f ms)",
+                self._base_url, reachable[0], latencies[reachable[0]] * 1000,
+            )
+        self._base_url = reachable[0]
+        self._host_failures = 0
+        return latencies
+
+    async def select_api_host(self) -> str:
+        """Resolve API hosts via the geo service and pick the fastest one."""
+        await self.probe_hosts(await self.resolve_hosts())
+        return self._base_url
+
+    def _record_host_result(self, healthy: bool) -> None:
+        """Track host health and fail over when it degrades."""
+        if healthy:
+            self._host_failures = 0
+            return
+
+        self._host_failures += 1
+        if self._host_failures < HOST_FAILURE_THRESHOLD or len(self._hosts) < 2:
+            return
+
+        index = self._hosts.index(self._base_url) if self._base_url in self._hosts else -1
+        next_host = self._hosts[(index + 1) % len(self._hosts)]
+        _LOGGER.warning(
+            "API host %s degraded after %d failed or slow requests, failing over to %s",
+            self._base_url, self._host_failures, next_host,
+        )
+        self._base_url = next_host
+        self._host_failures = 0
+
+    async def _fetch(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        priority: int = PRIORITY_POLL,
+    ) -> tuple[int, Mapping[str, str], bytes, float]:
+        """Make a request to the current API host.
+
+        Requests are queued by priority in the account rate limiter.
+        Returns the status, headers, raw body and elapsed time. Server
+        errors (5xx) count against the host's health and raise UjinApiError.
+        """
+        await self.rate_limiter.acquire(priority)
         session = await self._get_session()
+        url = f"{self._base_url}{endpoint}"
+        start = time.monotonic()
+
+        try:
+            async with session.request(
+                method,
+                url,
+                params=params,
+                json=json,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as response:
+                body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self._record_host_result(False)
+            self.metrics.record(endpoint, time.monotonic() - start, error=True)
+            raise
+
+        elapsed = time.monotonic() - start
+        if response.status >= 500:
+            self._record_host_result(False)
+            self.metrics.record(endpoint, elapsed, error=True)
+            raise UjinApiError(f"HTTP {response.status} from {url}")
+
+        self._record_host_result(elapsed < HOST_SLOW_THRESHOLD)
+        return response.status, response.headers, body, elapsed
 
+    def _decode(self, endpoint: str, body: bytes, elapsed: float) -> Any:
+        """Decode a JSON response body."""
+        try:
+            return json_loads(body)
+        except ValueError:
+            self.metrics.record(endpoint, elapsed, error=True)
+            raise
+
+    def _record_response(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None,
+        status: int,
+        elapsed: float,
+        data: Any,
+    ) -> None:
+        """Record metrics and, during a capture, the response."""
+        self.metrics.record(
+            endpoint,
+            elapsed,
+            api_error=isinstance(data, dict) and data.get("error") not in (0, None),
+        )
+        if self.recorder:
+            self.recorder.record_rest(method, endpoint, params, status, elapsed, data)
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        priority: int = PRIORITY_POLL,
+    ) -> dict[str, Any]:
+        """Make a request to the current API host and return decoded JSON."""
+        status, _headers, body, elapsed = await self._fetch(
+            method, endpoint, params=params, json=json, headers=headers, priority=priority
+        )
+        data = self._decode(endpoint, body, elapsed)
+        self._record_response(method, endpoint, params, status, elapsed, data)
+        return data
+
+    async def send_auth_code(self) -> dict[str, Any]:
+        """Send authentication code to email."""
         try:
-            url = f"{self._base_url}{API_AUTH_EMAIL_SEND}"
             payload = {
                 "email": self.email,
                 "app": API_APP_PARAM,
@@ -74,25 +418,24 @@ class UjinApiClient:
                 "Content-Type": "application/json",
             }
 
-            async with session.post(url, json=payload, headers=headers) as response:
-                data = await response.json()
-                if data.get("error") == 0:
-                    _LOGGER.info("Auth code sent to %s, wait time: %s sec",
-                                self.email, data.get("data", {}).get("time", 0))
-                    return data
-                else:
-                    _LOGGER.error("Failed to send auth code: %s", data.get("message"))
-                    return data
+            data = await self._request(
+                "POST", API_AUTH_EMAIL_SEND, json=payload, headers=headers,
+                priority=PRIORITY_COMMAND,
+            )
+            if data.get("error") == 0:
+                _LOGGER.info("Auth code sent to %s, wait time: %s sec",
+                            self.email, data.get("data", {}).get("time", 0))
+                return data
+            else:
+                _LOGGER.error("Failed to send auth code: %s", data.get("message"))
+                return data
         except Exception as err:
             _LOGGER.error("Error sending auth code: %s", err)
             raise
 
     async def verify_auth_code(self, code: str) -> bool:
         """Verify authentication code and get token."""
-        session = await self._get_session()
-
         try:
-            url = f"{self._base_url}{API_AUTH_EMAIL_VERIFY}"
             payload = {
                 "email": self.email,
                 "code": code,
@@ -108,37 +451,37 @@ class UjinApiClient:
                 "Content-Type": "application/json",
             }
 
-            async with session.post(url, json=payload, headers=headers) as response:
-                data = await response.json()
-                if data.get("error") == 0:
-                    self._token = data.get("data", {}).get("token")
-                    _LOGGER.info("Successfully authenticated with Ujin API")
-
-                    # Get user profile to retrieve area_guid
-                    await self._get_user_profile()
-                    return True
-                else:
-                    _LOGGER.error("Auth verification failed: %s", data.get("message"))
-                    return False
+            data = await self._request(
+                "POST", API_AUTH_EMAIL_VERIFY, json=payload, headers=headers,
+                priority=PRIORITY_COMMAND,
+            )
+            if data.get("error") == 0:
+                self._token = data.get("data", {}).get("token")
+                _LOGGER.info("Successfully authenticated with Ujin API")
+
+                # Get user profile to retrieve area_guid
+                await self._get_user_profile()
+                return True
+            else:
+                _LOGGER.error("Auth verification failed: %s", data.get("message"))
+                return False
         except Exception as err:
             _LOGGER.error("Error verifying auth code: %s", err)
             raise
 
     async def _get_user_profile(self) -> None:
         """Get user profile and extract area_guid."""
-        session = await self._get_session()
-
         try:
-            url = f"{self._base_url}{API_AUTH_USER}"
             params = {
                 "token": self._token,
                 "app": API_APP_PARAM,
                 "platform": API_PLATFORM_PARAM,
             }
 
-            async with session.get(url, params=params) as response:
-                data = await response.json()
-                _LOGGER.info("User profile retrieved")
+            data = await self._request(
+                "GET", API_AUTH_USER, params=params, priority=PRIORITY_COMMAND
+            )
+            _LOGGER.info("User profile retrieved")
 
             # Get apartments to extract area_guid
             await self._get_apartments()
@@ -151,65 +494,74 @@ class UjinApiClient:
             _LOGGER.error("Not authenticated")
             return []
 
-        session = await self._get_session()
-
         try:
-            url = f"{self._base_url}{API_PROFILE_OBJECTS}"
             params = {
                 "token": self._token,
                 "app": API_APP_PARAM,
                 "platform": API_PLATFORM_PARAM,
             }
 
-            async with session.get(url, params=params) as response:
-                data = await response.json()
-                _LOGGER.debug("Profile objects response: %s", data)
-
-                if data.get("error") is None or data.get("error") == 0:
-                    # Extract apartments from response
-                    apartments = []
-                    for complex_data in data.get("data", []):
-                        items = complex_data.get("items", [])
-                        apartments.extend(items)
-
-                    _LOGGER.info("Found %d apartment(s)", len(apartments))
-
-                    # Use first apartment's area_guid and user_token
-                    if apartments:
-                        if not self._area_guid:
-                            self._area_guid = apartments[0].get("area_guid")
-                            _LOGGER.info("Extracted area_guid: %s from apartment '%s'",
-                                        self._area_guid, apartments[0].get("title", "Unknown"))
-
-                        if not self._user_token:
-                            # Try user_token first, fallback to dpr_user_token
-                            self._user_token = apartments[0].get("user_token") or apartments[0].get("dpr_user_token")
-                            if self._user_token:
-                                _LOGGER.info("Extracted user_token: %s... from apartment",
-                                            self._user_token[:20] if self._user_token else "None")
-
-                    return apartments
-                else:
-                    _LOGGER.error("Failed to get apartments: %s", data.get("message"))
-                    return []
+            data = await self._request(
+                "GET", API_PROFILE_OBJECTS, params=params, priority=PRIORITY_COMMAND
+            )
+            _LOGGER.debug("Profile objects response: %s", data)
+
+            if data.get("error") is None or data.get("error") == 0:
+                # Extract apartments from response
+                apartments = []
+                for complex_data in data.get("data", []):
+                    items = complex_data.get("items", [])
+                    apartments.extend(items)
+
+                _LOGGER.info("Found %d apartment(s)", len(apartments))
+
+                # Use first apartment's area_guid and user_token
+                if apartments:
+                    if not self._area_guid:
+                        self._area_guid = apartments[0].get("area_guid")
+                        _LOGGER.info("Extracted area_guid: %s from apartment '%s'",
+                                    self._area_guid, apartments[0].get("title", "Unknown"))
+
+                    if not self._user_token:
+                        # Try user_token first, fallback to dpr_user_token
+                        self._user_token = apartments[0].get("user_token") or apartments[0].get("dpr_user_token")
+                        if self._user_token:
+                            _LOGGER.info("Extracted user_token: %s... from apartment",
+                                        self._user_token[:20] if self._user_token else "None")
+
+                return apartments
+            else:
+                _LOGGER.error("Failed to get apartments: %s", data.get("message"))
+                return []
         except Exception as err:
             _LOGGER.error("Error getting apartments: %s", err)
             return []
 
-    async def get_devices(self) -> list[dict[str, Any]]:
-        """Get all devices from Ujin API."""
+    async def get_devices(
+        self, priority: int = PRIORITY_POLL
+    ) -> DeviceSnapshot:
+        """Get all devices from Ujin API.
+
+        Large responses are decoded in the executor, so the event loop is
+        not blocked. The channels are returned as an immutable snapshot,
+        the same object for as long as the response does not change.
+
+        Args:
+            priority: Rate limiter priority (background poll by default)
+
+        Raises:
+            TokenExpiredError: The token is no longer accepted
+            UjinApiError: The API could not be reached or returned an error
+        """
         if not self._token:
             _LOGGER.error("Not authenticated. Call verify_auth_code first.")
-            return []
-
-        session = await self._get_session()
+            return ()
 
         # Use apartment user_token if available, otherwise fallback to main token
         token_to_use = self._user_token if self._user_token else self._token
         _LOGGER.debug("Using token for devices request: %s...", token_to_use[:20] if token_to_use else "None")
 
         try:
-            url = f"{self._base_url}{API_DEVICES_MAIN}"
             params = {
                 "token": token_to_use,
                 "app": API_APP_PARAM,
@@ -222,59 +574,254 @@ class UjinApiClient:
             if self._area_guid:
                 params["area_guid"] = self._area_guid
 
-            async with session.get(url, params=params) as response:
-                data = await response.json()
-                _LOGGER.debug("API Response: %s", data)
-
-                if data.get("error") == 0:
-                    devices_data = data.get("data", {}).get("devices", [])
-                    _LOGGER.debug("Devices data structure: %s", devices_data)
-
-                    # Extract devices from the total_list structure
-                    all_devices = []
-                    for device_group in devices_data:
-                        _LOGGER.debug("Device group type: %s", device_group.get("type"))
-                        if device_group.get("type") == "total_list":
-                            devices = device_group.get("data", [])
-                            _LOGGER.debug("Found %d devices in total_list", len(devices))
-                            all_devices.extend(devices)
-
-                    _LOGGER.info("Found %d devices", len(all_devices))
-                    return all_devices
-                else:
-                    # Check for token expiration
-                    error_msg = data.get("message", "")
-                    if "token" in error_msg.lower() or "auth" in error_msg.lower():
-                        _LOGGER.error("Token expired or invalid: %s", error_msg)
-                        raise TokenExpiredError(error_msg)
-
-                    _LOGGER.error("Failed to get devices: %s", error_msg)
-                    return []
+            # Captures need every response, skip the short-circuit then
+            use_snapshot = self._devices_snapshot is not None and not self.recorder
+            headers = None
+            if use_snapshot and self._devices_etag:
+                headers = {"If-None-Match": self._devices_etag}
+
+            status, response_headers, body, elapsed = await self._fetch(
+                "GET", API_DEVICES_MAIN, params=params, headers=headers, priority=priority
+            )
+            # Large bodies are hashed and decoded off the event loop
+            offload = len(body) > self.parse_threshold
+            not_modified = status == 304
+            digest = None
+            if not not_modified:
+                digest = await self._run_parser(offload, body_digest, body)
+            if use_snapshot and (not_modified or digest == self._devices_digest):
+                self._record_response("GET", API_DEVICES_MAIN, params, status, elapsed, None)
+                self.snapshot_metrics.record_hit(not_modified=not_modified)
+                return self._devices_snapshot
+            self.snapshot_metrics.record_miss()
+
+            data, all_devices, endpoints = await self._parse_devices(body, elapsed, offload)
+            self._record_response("GET", API_DEVICES_MAIN, params, status, elapsed, data)
+
+            if all_devices is not None:
+                _LOGGER.info("Found %d devices", len(all_devices))
+                self._local_endpoints = endpoints
+                _LOGGER.debug("%d device(s) reachable locally", len(endpoints))
+                # Returned as is while the response body stays the same
+                self._devices_snapshot = all_devices
+                self._devices_digest = digest
+                self._devices_etag = response_headers.get("ETag")
+                return all_devices
+            else:
+                # Check for token expiration
+                error_msg = data.get("message", "")
+                if "token" in error_msg.lower() or "auth" in error_msg.lower():
+                    _LOGGER.error("Token expired or invalid: %s", error_msg)
+                    raise TokenExpiredError(error_msg)
+
+                _LOGGER.error("Failed to get devices: %s", error_msg)
+                raise UjinApiError(error_msg or "Failed to get devices")
+        except (TokenExpiredError, UjinApiError):
+            raise
         except Exception as err:
             _LOGGER.error("Error getting devices: %s", err)
-            return []
+            raise UjinApiError(f"Error getting devices: {err}") from err
+
+    @staticmethod
+    async def _run_parser(offload: bool, func: Callable[[bytes], Any], body: bytes) -> Any:
+        """Run a parsing step inline or in the executor."""
+        if offload:
+            return await asyncio.get_running_loop().run_in_executor(None, func, body)
+        return func(body)
+
+    async def _parse_devices(
+        self, body: bytes, elapsed: float, offload: bool
+    ) -> tuple[Any, DeviceSnapshot | None, dict[str, dict[str, Any]]]:
+        """Parse a devices/main response, in the executor if offload is set."""
+        start = time.perf_counter()
+        try:
+            result = await self._run_parser(offload, parse_devices_main, body)
+        except ValueError:
+            self.metrics.record(API_DEVICES_MAIN, elapsed, error=True)
+            raise
+        duration = time.perf_counter() - start
+        # Only an inline parse blocks the loop
+        self.parse_metrics.record(len(body), duration, offloaded=offload)
+        return result
+
+    def _get_route_stats(self, device_id: str) -> dict[str, Any]:
+        """Get (or create) routing statistics for a device."""
+        if device_id not in self._route_stats:
+            self._route_stats[device_id] = {
+                "route": ROUTE_CLOUD,
+                "local_success": 0,
+                "local_failure": 0,
+                "cloud_success": 0,
+                "cloud_failure": 0,
+                "local_consecutive_failures": 0,
+                "local_disabled_until": 0.0,
+            }
+        return self._route_stats[device_id]
+
+    def _select_route(self, device_id: str) -> str:
+        """Select the route for the next command to a device."""
+        if not self.local_control or device_id not in self._local_endpoints:
+            return ROUTE_CLOUD
+        stats = self._get_route_stats(device_id)
+        if stats["local_disabled_until"] > time.monotonic():
+            return ROUTE_CLOUD
+        return ROUTE_LOCAL
+
+    def _record_local_result(self, device_id: str, success: bool) -> None:
+        """Count a local exchange and back off after repeated failures.
+
+        Commands and state reads share the counters, so a device that stops
+        answering on the LAN is left to the cloud for LOCAL_RETRY_AFTER.
+        """
+        stats = self._get_route_stats(device_id)
+        if success:
+            stats["local_success"] += 1
+            stats["local_consecutive_failures"] = 0
+            return
+
+        stats["local_failure"] += 1
+        stats["local_consecutive_failures"] += 1
+        if stats["local_consecutive_failures"] >= LOCAL_FAILURE_THRESHOLD:
+            stats["local_disabled_until"] = time.monotonic() + LOCAL_RETRY_AFTER
+            _LOGGER.warning(
+                "Device %s failed locally %d times in a row, "
+                "using cloud for the next %d seconds",
+                device_id,
+                stats["local_consecutive_failures"],
+                LOCAL_RETRY_AFTER,
+            )
+
+    def is_locally_reachable(self, device_id: str) -> bool:
+        """Return True if state can currently be read from the LAN."""
+        return self._select_route(device_id) == ROUTE_LOCAL
+
+    async def get_local_states(
+        self, devices: list[dict[str, Any]]
+    ) -> dict[tuple[str, str], int]:
+        """Read control values of locally reachable devices over the LAN.
+
+        Returns values keyed by (device id, signal) for every channel that
+        answered; channels that did not answer are left to the cloud.
+        """
+        signals: dict[str, list[str]] = {}
+        for device in devices:
+            if device.get("controls") and self.is_locally_reachable(device["id"]):
+                signals.setdefault(device["id"], []).append(device["signal"])
+        if not signals:
+            return {}
+
+        results = await asyncio.gather(
+            *(
+                self._read_local_device(device_id, device_signals)
+                for device_id, device_signals in signals.items()
+            )
+        )
+
+        states = {}
+        for device_states in results:
+            states.update(device_states)
+
+        _LOGGER.debug(
+            "Read %d of %d channel(s) locally",
+            len(states), sum(len(names) for names in signals.values()),
+        )
+        return states
+
+    async def _read_local_device(
+        self, device_id: str, signals: list[str]
+    ) -> dict[tuple[str, str], int]:
+        """Read the channels of one device, giving up at the first failure.
+
+        A device that does not answer for one channel will not answer for
+        the next, so each cycle costs it at most one timeout.
+        """
+        endpoint = self._local_endpoints[device_id]
+        states = {}
+        for signal in signals:
+            try:
+                states[(device_id, signal)] = await self._local.get_state(
+                    endpoint, signal
+                )
+            except LocalTransportError as err:
+                _LOGGER.debug(
+                    "Local state of %s/%s unavailable: %s", device_id, signal, err
+                )
+                self._record_local_result(device_id, False)
+                return states
+        self._record_local_result(device_id, True)
+        return states
+
+    def get_route_stats(self) -> dict[str, dict[str, Any]]:
+        """Return per-device route selection and success rates."""
+        result = {}
+        for device_id, stats in self._route_stats.items():
+            local_total = stats["local_success"] + stats["local_failure"]
+            cloud_total = stats["cloud_success"] + stats["cloud_failure"]
+            result[device_id] = {
+                "route": stats["route"],
+                "local_available": device_id in self._local_endpoints,
+                "local_success": stats["local_success"],
+                "local_failure": stats["local_failure"],
+                "local_success_rate": (
+                    stats["local_success"] / local_total if local_total else None
+                ),
+                "cloud_success": stats["cloud_success"],
+                "cloud_failure": stats["cloud_failure"],
+                "cloud_success_rate": (
+                    stats["cloud_success"] / cloud_total if cloud_total else None
+                ),
+            }
+        return result
 
     async def send_device_command(
         self, device_id: str, signal: str, state: int
     ) -> bool:
         """Send command to device.
 
+        The command goes straight to the device over sapfir-unicast when it
+        is reachable on the LAN, falling back to the cloud otherwise.
+
         Args:
             device_id: Device serial number
             signal: Signal name (e.g., 'rele1', 'rele-w')
             state: State to set (0 or 1)
         """
+        stats = self._get_route_stats(device_id)
+
+        if self._select_route(device_id) == ROUTE_LOCAL:
+            try:
+                await self._local.send_command(
+                    self._local_endpoints[device_id], device_id, signal, state
+                )
+            except LocalTransportError as err:
+                _LOGGER.warning(
+                    "Local command to %s failed (%s), falling back to cloud",
+                    device_id, err,
+                )
+                self._record_local_result(device_id, False)
+            else:
+                self._record_local_result(device_id, True)
+                stats["route"] = ROUTE_LOCAL
+                _LOGGER.info("Command sent locally to device %s", device_id)
+                return True
+
+        stats["route"] = ROUTE_CLOUD
+        success = await self._send_cloud_command(device_id, signal, state)
+        stats["cloud_success" if success else "cloud_failure"] += 1
+        return success
+
+    async def _send_cloud_command(
+        self, device_id: str, signal: str, state: int
+    ) -> bool:
+        """Send command to device through the cloud send-signal endpoint."""
         if not self._token:
             _LOGGER.error("Not authenticated")
             return False
 
-        session = await self._get_session()
-
         # Use apartment user_token if available, otherwise fallback to main token
         token_to_use = self._user_token if self._user_token else self._token
 
         try:
-            url = f"{self._base_url}{API_SEND_SIGNAL}"
             params = {
                 "serialnumber": device_id,
                 "signal": signal,
@@ -289,24 +836,116 @@ class UjinApiClient:
             if self._area_guid:
                 params["area_guid"] = self._area_guid
 
-            async with session.get(url, params=params) as response:
-                data = await response.json()
-                if data.get("error") == 0:
-                    _LOGGER.info("Command sent successfully to device %s", device_id)
-                    return True
-                else:
-                    error_msg = data.get("message", "")
-                    # Check for token expiration
-                    if "token" in error_msg.lower() or "auth" in error_msg.lower():
-                        _LOGGER.error("Token expired or invalid: %s", error_msg)
-                        raise TokenExpiredError(error_msg)
-
-                    _LOGGER.error("Failed to send command: %s", error_msg)
-                    return False
+            data = await self._request(
+                "GET", API_SEND_SIGNAL, params=params, priority=PRIORITY_COMMAND
+            )
+            if data.get("error") == 0:
+                _LOGGER.info("Command sent successfully to device %s", device_id)
+                return True
+            else:
+                error_msg = data.get("message", "")
+                # Check for token expiration
+                if "token" in error_msg.lower() or "auth" in error_msg.lower():
+                    _LOGGER.error("Token expired or invalid: %s", error_msg)
+                    raise TokenExpiredError(error_msg)
+
+                _LOGGER.error("Failed to send command: %s", error_msg)
+                return False
         except Exception as err:
             _LOGGER.error("Error sending device command: %s", err)
             return False
 
+    async def get_autoscripts(
+        self, priority: int = PRIORITY_POLL
+    ) -> list[dict[str, Any]]:
+        """Get the server-side autoscripts (scenes) of the account.
+
+        Raises:
+            TokenExpiredError: The token is no longer accepted
+            UjinApiError: The API could not be reached or returned an error
+        """
+        if not self._token:
+            _LOGGER.error("Not authenticated. Call verify_auth_code first.")
+            return []
+
+        token_to_use = self._user_token if self._user_token else self._token
+
+        try:
+            params = {
+                "token": token_to_use,
+                "app": API_APP_PARAM,
+                "platform": API_PLATFORM_PARAM,
+            }
+            if self._area_guid:
+                params["area_guid"] = self._area_guid
+
+            data = await self._request(
+                "GET", API_AUTOSCRIPTS_LIST, params=params, priority=priority
+            )
+
+            if data.get("error") == 0:
+                payload = data.get("data") or []
+                if isinstance(payload, dict):
+                    # Key of the list is not documented, accept the likely ones
+                    payload = next(
+                        (
+                            payload[key]
+                            for key in ("autoscripts", "list", "items")
+                            if isinstance(payload.get(key), list)
+                        ),
+                        [],
+                    )
+                autoscripts = [
+                    item for item in payload
+                    if isinstance(item, dict) and item.get("id") is not None
+                ]
+                _LOGGER.debug("Found %d autoscripts", len(autoscripts))
+                return autoscripts
+
+            error_msg = data.get("message", "")
+            if "token" in error_msg.lower() or "auth" in error_msg.lower():
+                _LOGGER.error("Token expired or invalid: %s", error_msg)
+                raise TokenExpiredError(error_msg)
+
+            _LOGGER.error("Failed to get autoscripts: %s", error_msg)
+            raise UjinApiError(error_msg or "Failed to get autoscripts")
+        except (TokenExpiredError, UjinApiError):
+            raise
+        except Exception as err:
+            _LOGGER.error("Error getting autoscripts: %s", err)
+            raise UjinApiError(f"Error getting autoscripts: {err}") from err
+
+    async def run_autoscript(self, autoscript_id: str) -> bool:
+        """Run an autoscript; the Ujin backend switches its devices."""
+        if not self._token:
+            _LOGGER.error("Not authenticated")
+            return False
+
+        token_to_use = self._user_token if self._user_token else self._token
+
+        try:
+            params = {
+                "id": str(autoscript_id),
+                "token": token_to_use,
+                "app": API_APP_PARAM,
+                "platform": API_PLATFORM_PARAM,
+            }
+            if self._area_guid:
+                params["area_guid"] = self._area_guid
+
+            data = await self._request(
+                "GET", API_AUTOSCRIPTS_RUN, params=params, priority=PRIORITY_COMMAND
+            )
+            if data.get("error") == 0:
+                _LOGGER.info("Autoscript %s started", autoscript_id)
+                return True
+
+            _LOGGER.error("Failed to run autoscript %s: %s", autoscript_id, data.get("message", ""))
+            return False
+        except Exception as err:
+            _LOGGER.error("Error running autoscript %s: %s", autoscript_id, err)
+            return False
+
     def set_area_guid(self, area_guid: str) -> None:
         """Set area GUID for API requests."""
         self._area_guid = area_guid
@@ -317,13 +956,10 @@ class UjinApiClient:
             _LOGGER.error("Not authenticated")
             return None
 
-        session = await self._get_session()
-
         # Use apartment user_token if available, otherwise fallback to main token
         token_to_use = self._user_token if self._user_token else self._token
 
         try:
-            url = f"{self._base_url}{API_DEVICES_WSS}"
             params = {
                 "token": token_to_use,
                 "app": API_APP_PARAM,
@@ -333,32 +969,33 @@ class UjinApiClient:
             if self._area_guid:
                 params["area_guid"] = self._area_guid
 
-            async with session.get(url, params=params) as response:
-                data = await response.json()
-                _LOGGER.debug("WebSocket API response: %s", data)
-
-                if data.get("error") == 0:
-                    wss_data = data.get("data", {})
-                    _LOGGER.debug("WebSocket data structure: %s", wss_data)
-
-                    # WebSocket URL is in 'wss' key as an array
-                    wss_array = wss_data.get("wss", [])
-                    if wss_array and len(wss_array) > 0:
-                        wss_url = wss_array[0]
-                        _LOGGER.info("Got WebSocket URL: %s", wss_url)
-                        return wss_url
-                    else:
-                        _LOGGER.error("No WebSocket URL in response. Full data: %s", wss_data)
-                        return None
+            data = await self._request(
+                "GET", API_DEVICES_WSS, params=params, priority=PRIORITY_REFRESH
+            )
+            _LOGGER.debug("WebSocket API response: %s", data)
+
+            if data.get("error") == 0:
+                wss_data = data.get("data", {})
+                _LOGGER.debug("WebSocket data structure: %s", wss_data)
+
+                # WebSocket URL is in 'wss' key as an array
+                wss_array = wss_data.get("wss", [])
+                if wss_array and len(wss_array) > 0:
+                    wss_url = wss_array[0]
+                    _LOGGER.info("Got WebSocket URL: %s", wss_url)
+                    return wss_url
                 else:
-                    error_msg = data.get("message", "")
-                    _LOGGER.error("Failed to get WebSocket URL: %s", error_msg)
+                    _LOGGER.error("No WebSocket URL in response. Full data: %s", wss_data)
                     return None
+            else:
+                error_msg = data.get("message", "")
+                _LOGGER.error("Failed to get WebSocket URL: %s", error_msg)
+                return None
         except Exception as err:
             _LOGGER.error("Error getting WebSocket URL: %s", err)
             return None
 
     async def close(self) -> None:
-        """Close the API session."""
-        if self._session:
+        """Close the API session, unless it is shared."""
+        if self._owns_session and self._session:
             await self._session.close()
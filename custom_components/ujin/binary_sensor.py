@@ -0,0 +1,52 @@
+"""Binary sensor platform for Ujin Smart Home."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .entity import UjinDeviceDiagnosticEntity, first_channels
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Ujin binary sensors from a config entry."""
+    coordinator = hass.data[DOMAIN].entries[entry.entry_id]["coordinator"]
+
+    async_add_entities(
+        UjinOnlineBinarySensor(coordinator.tier_for(device), device)
+        for device in first_channels(coordinator.data)
+    )
+
+
+class UjinOnlineBinarySensor(UjinDeviceDiagnosticEntity, BinarySensorEntity):
+    """Cloud connectivity of a Ujin device."""
+
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+    _attr_name = "Online"
+
+    def __init__(self, coordinator, device_data: dict[str, Any]) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(coordinator, device_data, "online")
+
+    def _value(self, device: dict[str, Any]) -> bool:
+        """Return True if the cloud reports the device as online."""
+        return device.get("status") == "ok"
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the device is online."""
+        return self.value
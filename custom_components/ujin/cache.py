@@ -0,0 +1,79 @@
+"""Device state cache for Ujin Smart Home."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .api import DeviceSnapshot
+
+
+class UjinDeviceCache:
+    """Last known device data with per-device confirmation times.
+
+    The coordinator keeps serving this data while the cloud is unreachable;
+    a device counts as fresh while it was confirmed within the staleness
+    budget.
+    """
+
+    def __init__(self, stale_budget: float) -> None:
+        """Initialize the cache.
+
+        Args:
+            stale_budget: Seconds cached state may be served unconfirmed
+        """
+        self.stale_budget = timedelta(seconds=stale_budget)
+        self._devices: DeviceSnapshot = ()
+        self._updated: datetime | None = None
+        self._last_confirmed: dict[tuple[str, str], datetime] = {}
+
+    @property
+    def devices(self) -> DeviceSnapshot:
+        """Return the cached device list."""
+        return self._devices
+
+    @property
+    def updated(self) -> datetime | None:
+        """Return when the whole device list was last confirmed."""
+        return self._updated
+
+    @property
+    def is_fresh(self) -> bool:
+        """Return True if the whole device list is within the budget."""
+        return (
+            self._updated is not None
+            and dt_util.utcnow() - self._updated <= self.stale_budget
+        )
+
+    def update(
+        self,
+        devices: DeviceSnapshot,
+        confirmed: Iterable[tuple[str, str]] | None = None,
+    ) -> None:
+        """Store device data.
+
+        Args:
+            devices: Full device list to serve
+            confirmed: (device id, signal) keys confirmed just now, or None
+                if the whole list was confirmed
+        """
+        now = dt_util.utcnow()
+        self._devices = devices
+        if confirmed is None:
+            self._updated = now
+            confirmed = ((device["id"], device["signal"]) for device in devices)
+        for key in confirmed:
+            self._last_confirmed[key] = now
+
+    def last_confirmed(self, device_id: str, signal: str) -> datetime | None:
+        """Return when a device state was last confirmed."""
+        return self._last_confirmed.get((device_id, signal))
+
+    def is_device_fresh(self, device_id: str, signal: str) -> bool:
+        """Return True if a device state was confirmed within the budget."""
+        confirmed = self._last_confirmed.get((device_id, signal))
+        return (
+            confirmed is not None
+            and dt_util.utcnow() - confirmed <= self.stale_budget
+        )
@@ -8,11 +8,33 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
 
 from .api import UjinApiClient
-from .const import DOMAIN
+from .const import (
+    CONF_API_HOST,
+    CONF_API_HOSTS,
+    CONF_FAST_INTERVAL,
+    CONF_LOCAL_CONTROL,
+    CONF_NORMAL_INTERVAL,
+    CONF_PARSE_THRESHOLD,
+    CONF_RATE_BURST,
+    CONF_RATE_LIMIT,
+    CONF_SLOW_INTERVAL,
+    CONF_STALE_BUDGET,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_LOCAL_CONTROL,
+    DEFAULT_NORMAL_INTERVAL,
+    DEFAULT_PARSE_THRESHOLD,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_SLOW_INTERVAL,
+    DEFAULT_STALE_BUDGET,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,6 +61,14 @@ class UjinConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._email: str | None = None
         self._api_client: UjinApiClient | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> UjinOptionsFlow:
+        """Get the options flow for this handler."""
+        return UjinOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -48,7 +78,12 @@ class UjinConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             try:
                 self._email = user_input[CONF_EMAIL]
-                self._api_client = UjinApiClient(email=self._email, session=None)
+                self._api_client = UjinApiClient(
+                    email=self._email, session=async_get_clientsession(self.hass)
+                )
+
+                # Pick the region-appropriate API host before authenticating
+                await self._api_client.select_api_host()
 
                 # Send authentication code
                 result = await self._api_client.send_auth_code()
@@ -109,6 +144,8 @@ class UjinConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             "token": token,
                             "user_token": user_token,
                             "area_guid": area_guid,
+                            CONF_API_HOST: self._api_client.base_url,
+                            CONF_API_HOSTS: self._api_client.hosts,
                         },
                     )
                 else:
@@ -125,3 +162,70 @@ class UjinConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 "info": f"Введите код из письма на {self._email}"
             },
         )
+
+
+class UjinOptionsFlow(config_entries.OptionsFlow):
+    """Handle Ujin Smart Home options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            # Cached state must outlive the longest gap between polls
+            longest = max(
+                user_input.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL),
+                user_input.get(CONF_NORMAL_INTERVAL, DEFAULT_NORMAL_INTERVAL),
+                user_input.get(CONF_SLOW_INTERVAL, DEFAULT_SLOW_INTERVAL),
+            )
+            if user_input.get(CONF_STALE_BUDGET, DEFAULT_STALE_BUDGET) < longest:
+                errors[CONF_STALE_BUDGET] = "stale_budget_too_short"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = {**self._config_entry.options, **(user_input or {})}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_RATE_LIMIT,
+                        default=options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=50)),
+                    vol.Optional(
+                        CONF_RATE_BURST,
+                        default=options.get(CONF_RATE_BURST, DEFAULT_RATE_BURST),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                    vol.Optional(
+                        CONF_STALE_BUDGET,
+                        default=options.get(CONF_STALE_BUDGET, DEFAULT_STALE_BUDGET),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=86400)),
+                    vol.Optional(
+                        CONF_FAST_INTERVAL,
+                        default=options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                    vol.Optional(
+                        CONF_NORMAL_INTERVAL,
+                        default=options.get(CONF_NORMAL_INTERVAL, DEFAULT_NORMAL_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                    vol.Optional(
+                        CONF_SLOW_INTERVAL,
+                        default=options.get(CONF_SLOW_INTERVAL, DEFAULT_SLOW_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=86400)),
+                    vol.Optional(
+                        CONF_PARSE_THRESHOLD,
+                        default=options.get(CONF_PARSE_THRESHOLD, DEFAULT_PARSE_THRESHOLD),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=65536)),
+                    vol.Optional(
+                        CONF_LOCAL_CONTROL,
+                        default=options.get(CONF_LOCAL_CONTROL, DEFAULT_LOCAL_CONTROL),
+                    ): bool,
+                }
+            ),
+            errors=errors,
+        )
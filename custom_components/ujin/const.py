@@ -8,11 +8,63 @@ CONF_PASSWORD = "password"
 CONF_EMAIL = "email"
 CONF_TOKEN = "token"
 CONF_AREA_GUID = "area_guid"
+CONF_API_HOST = "api_host"
+CONF_API_HOSTS = "api_hosts"
+CONF_RATE_LIMIT = "rate_limit"
+CONF_RATE_BURST = "rate_burst"
+CONF_STALE_BUDGET = "stale_budget"
+CONF_FAST_INTERVAL = "fast_interval"
+CONF_NORMAL_INTERVAL = "normal_interval"
+CONF_SLOW_INTERVAL = "slow_interval"
+CONF_PARSE_THRESHOLD = "parse_threshold"
+CONF_LOCAL_CONTROL = "local_control"
 
 # API Configuration
 API_BASE_URL = "https://api-product.mysmartflat.ru"
 API_GEO_URL = "https://geo.ujin-technologies.com"
 
+# API host selection
+REQUEST_TIMEOUT = 15  # seconds
+GEO_PROBE_TIMEOUT = 5  # seconds per host latency probe
+GEO_REPROBE_INTERVAL = 3600  # seconds between host latency probes
+HOST_FAILURE_THRESHOLD = 3  # consecutive failed or slow requests before failover
+HOST_SLOW_THRESHOLD = 5.0  # seconds; slower responses count as degraded
+
+# Stale-while-revalidate device cache
+DEFAULT_STALE_BUDGET = 300  # seconds cached state is served during outages
+STALE_RETRY_INTERVAL = 10  # seconds between revalidation attempts while stale
+
+# Polling tiers: sensors and leak controllers, other devices, and relays
+# that receive WebSocket pushes
+TIER_FAST = "fast"
+TIER_NORMAL = "normal"
+TIER_SLOW = "slow"
+DEFAULT_FAST_INTERVAL = 10  # seconds
+DEFAULT_NORMAL_INTERVAL = 30  # seconds
+DEFAULT_SLOW_INTERVAL = 300  # seconds
+POLL_STAGGER = 7  # seconds between first polls of consecutive entries
+AUTOSCRIPTS_REFRESH_INTERVAL = 1800  # seconds between autoscript list refreshes
+TELEMETRY_CAPACITY = 128  # value changes kept per channel and metric
+TELEMETRY_HOURS_KEPT = 2  # past hours of evicted samples kept as aggregates
+TELEMETRY_IMPORT_MINUTE = 5  # minute past the hour statistics are imported at
+
+# devices/main responses larger than this are decoded in the executor
+DEFAULT_PARSE_THRESHOLD = 256  # KiB, 0 = always
+
+# Client-side rate limiting (per account)
+DEFAULT_RATE_LIMIT = 2.0  # requests per second
+DEFAULT_RATE_BURST = 10
+
+# Request priorities, lower is served first
+PRIORITY_COMMAND = 0
+PRIORITY_REFRESH = 1
+PRIORITY_POLL = 2
+PRIORITY_NAMES = {
+    PRIORITY_COMMAND: "command",
+    PRIORITY_REFRESH: "refresh",
+    PRIORITY_POLL: "poll",
+}
+
 # API Endpoints
 API_AUTH_EMAIL_SEND = "/api/v1/auth/code/email/send/"
 API_AUTH_EMAIL_VERIFY = "/api/v1/auth/code/email/auth/"
@@ -22,6 +74,9 @@ API_DEVICES_MAIN = "/api/devices/main/"
 API_DEVICES_WSS = "/api/devices/wss/"
 API_SEND_SIGNAL = "/api/apartment/send-signal/"
 API_APP_INIT = "/api/v1/app/init/"
+API_AUTOSCRIPTS_LIST = "/api/autoscripts/list/"
+# Not in the captured traffic, named after the list endpoint
+API_AUTOSCRIPTS_RUN = "/api/autoscripts/run/"
 
 # API Parameters
 API_APP_PARAM = "ujin"
@@ -32,3 +87,22 @@ HEADER_APP_TYPE = "X-APP-TYPE"
 HEADER_APP_PLATFORM = "X-APP-PLATFORM"
 HEADER_APP_LANG = "X-APP-LANG"
 HEADER_APP_VERSION = "X-APP-VERSION"
+
+# Local (LAN) transport
+LOCAL_PROTOCOL = "sapfir-unicast"
+DEFAULT_LOCAL_CONTROL = False  # opt-in, the datagram format is not confirmed on hardware
+LOCAL_COMMAND_TIMEOUT = 1.5  # seconds to wait for a device acknowledgement
+LOCAL_FAILURE_THRESHOLD = 3  # consecutive local failures before preferring cloud
+LOCAL_RETRY_AFTER = 300  # seconds before retrying local after falling back
+LOCAL_MAX_CONCURRENT = 16  # datagram sockets open at once for LAN requests
+
+ROUTE_LOCAL = "local"
+ROUTE_CLOUD = "cloud"
+CLOUD_RESYNC_INTERVAL = 600  # seconds between cloud refreshes when all devices are local
+
+# Services
+SERVICE_RECORD_TRAFFIC = "record_traffic"
+SERVICE_PROFILE = "profile"
+ATTR_DURATION = "duration"
+DEFAULT_RECORD_DURATION = 300  # seconds
+DEFAULT_PROFILE_DURATION = 60  # seconds
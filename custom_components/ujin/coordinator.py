@@ -0,0 +1,562 @@
+"""Data update coordinator for Ujin Smart Home."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import DeviceSnapshot, TokenExpiredError, UjinApiClient, UjinApiError
+from .cache import UjinDeviceCache
+from .const import (
+    AUTOSCRIPTS_REFRESH_INTERVAL,
+    CLOUD_RESYNC_INTERVAL,
+    DEFAULT_NORMAL_INTERVAL,
+    DOMAIN,
+    PRIORITY_POLL,
+    PRIORITY_REFRESH,
+    STALE_RETRY_INTERVAL,
+    TIER_FAST,
+    TIER_NORMAL,
+    TIER_SLOW,
+)
+from .metrics import CycleMetrics
+from .profiler import PROFILER
+from .telemetry import UjinTelemetry
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(seconds=30)
+
+
+def _with_control_value(device: Mapping[str, Any], value: int) -> Mapping[str, Any]:
+    """Return a copy of a device with its first control value replaced."""
+    controls = device["controls"]
+    return MappingProxyType({
+        **device,
+        "status": "ok",
+        "controls": [{**controls[0], "value": value}, *controls[1:]],
+    })
+
+
+def device_tier(device: Mapping[str, Any]) -> str:
+    """Return the polling tier of a channel."""
+    controls = device.get("controls", [])
+    if not controls or controls[0].get("type") != "switch":
+        # Sensors and other read-only channels
+        return TIER_FAST
+    model = device.get("model", "").lower()
+    if (
+        device.get("svg") == "waterController"
+        or "aqua" in model
+        or "zld" in model
+        or "вода" in device.get("category_name", "").lower()
+    ):
+        # Leak controllers, valve state matters quickly
+        return TIER_FAST
+    if device.get("svg") in ("light", "electricSockets") or "din" in model:
+        # Relays, changes are pushed over the WebSocket
+        return TIER_SLOW
+    return TIER_NORMAL
+
+
+class UjinDataUpdateCoordinator(DataUpdateCoordinator[DeviceSnapshot]):
+    """Coordinator reading device state locally first, then from the cloud.
+
+    Devices reachable over sapfir-unicast are read straight from the LAN.
+    The cloud devices/main endpoint is only polled when some device could
+    not be read locally, plus a periodic resync to pick up metadata changes.
+
+    When the cloud fails, the last known state keeps being served within
+    the staleness budget while revalidation continues at a faster pace.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: UjinApiClient,
+        stale_budget: float,
+        update_interval: timedelta | None = SCAN_INTERVAL,
+    ) -> None:
+        """Initialize the coordinator.
+
+        Args:
+            update_interval: Polling interval, None when tier coordinators
+                drive the refreshes
+        """
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=update_interval,
+            always_update=False,
+        )
+        self.api = api
+        self._normal_interval = update_interval
+        self._last_cloud_update = 0.0
+        # Last refresh attempt, successful or not
+        self._last_refresh = 0.0
+        self.tiers: dict[str, UjinTierCoordinator] = {}
+        # Last known state, served during transient cloud failures
+        self.cache = UjinDeviceCache(stale_budget)
+        self.serving_stale = False
+        self.metrics = CycleMetrics()
+        # Value changes of every channel, aggregated into statistics
+        self.telemetry = UjinTelemetry()
+        # Rate limiter priority of the next cloud poll
+        self._refresh_priority = PRIORITY_POLL
+        # LAN states a tier poll already read for the next refresh
+        self._pending_local_states: dict[tuple[str, str], int] | None = None
+        # Held by the tier poll that refreshes, tiers firing together share it
+        self._tier_refresh_lock = asyncio.Lock()
+        # Tier polls never reach the cloud more often than this
+        self.min_cloud_interval = timedelta(seconds=DEFAULT_NORMAL_INTERVAL)
+        # (id, signal) -> channel, rebuilt lazily when data is replaced
+        self._index: dict[tuple[str, str], Mapping[str, Any]] = {}
+        self._indexed_data: DeviceSnapshot | None = None
+        # Called after every cycle, listeners only when data changed
+        self._cycle_listeners: list[CALLBACK_TYPE] = []
+
+    async def async_request_resync(self) -> None:
+        """Request a refresh triggered by a WebSocket push.
+
+        Such refreshes are queued ahead of background polls but behind
+        interactive commands.
+        """
+        self._refresh_priority = PRIORITY_REFRESH
+        await self.async_request_refresh()
+
+    @callback
+    def handle_websocket_message(self, data: dict[str, Any]) -> None:
+        """Handle incoming WebSocket message."""
+        try:
+            # WebSocket messages contain device updates
+            if "data" in data:
+                device = data["data"]
+                if isinstance(device, dict) and "id" in device and "signal" in device:
+                    self.telemetry.record_device(device)
+                # Resync device state through the regular update path
+                self.hass.async_create_task(self.async_request_resync())
+        except Exception as err:
+            _LOGGER.error("Error handling WebSocket message: %s", err)
+
+    async def _async_update_data(self) -> DeviceSnapshot:
+        """Fetch data and record how long the cycle took."""
+        profiling = PROFILER.active
+        if profiling:
+            PROFILER.enter()
+        start = time.monotonic()
+        success = False
+        was_stale = self.serving_stale
+        try:
+            data = await self._async_fetch_data()
+            success = True
+            # Availability follows the cache age, notify even if data is equal
+            self.always_update = self.serving_stale or was_stale
+            return data
+        finally:
+            self._last_refresh = time.monotonic()
+            self.metrics.record_cycle(time.monotonic() - start, success)
+            for cycle_callback in list(self._cycle_listeners):
+                cycle_callback()
+            if profiling:
+                PROFILER.exit()
+
+    @callback
+    def async_add_cycle_listener(self, cycle_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for every update cycle, whether or not data changed."""
+        self._cycle_listeners.append(cycle_callback)
+
+        @callback
+        def remove_cycle_listener() -> None:
+            self._cycle_listeners.remove(cycle_callback)
+
+        return remove_cycle_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners and record the fan-out time."""
+        profiling = PROFILER.active
+        if profiling:
+            PROFILER.enter()
+        start = time.monotonic()
+        super().async_update_listeners()
+        self.metrics.record_fanout(time.monotonic() - start)
+        if profiling:
+            PROFILER.exit()
+
+    @callback
+    def async_setup_tiers(
+        self,
+        intervals: dict[str, timedelta],
+        delays: dict[str, float] | None = None,
+    ) -> CALLBACK_TYPE:
+        """Create tier coordinators polling at the given intervals.
+
+        Args:
+            intervals: Polling interval of each tier
+            delays: Seconds to wait before the first poll of each tier,
+                to keep the timers of several entries apart
+
+        Returns a callback removing the tiers.
+        """
+        delays = delays or {}
+        unsubscribers = []
+        for tier, interval in intervals.items():
+            tier_coordinator = UjinTierCoordinator(self.hass, self, tier, interval)
+            self.tiers[tier] = tier_coordinator
+            unsubscribers.append(
+                self.async_add_listener(tier_coordinator.handle_store_update)
+            )
+            if delays.get(tier):
+                unsubscribers.append(tier_coordinator.async_delay_start(delays[tier]))
+
+        @callback
+        def async_remove_tiers() -> None:
+            for unsubscribe in unsubscribers:
+                unsubscribe()
+            self.tiers.clear()
+
+        return async_remove_tiers
+
+    @callback
+    def tier_for(self, device: Mapping[str, Any]) -> UjinDataUpdateCoordinator | UjinTierCoordinator:
+        """Return the coordinator entities of a channel should listen to."""
+        return self.tiers.get(device_tier(device), self)
+
+    def tier_devices(self, tier: str) -> DeviceSnapshot:
+        """Return the channels of a tier."""
+        return tuple(device for device in self.data or () if device_tier(device) == tier)
+
+    async def async_poll_tier(self, tier: str, max_age: timedelta) -> None:
+        """Refresh the channels of a tier.
+
+        Channels reachable over the LAN are read locally. The cloud is only
+        polled when some channel is not, and no refresh ran within max_age
+        or min_cloud_interval, whichever is longer: a fast tier of sensors
+        that only the cloud reports does not raise the cloud request rate.
+        Tiers due together share one refresh.
+        """
+        devices = self.tier_devices(tier)
+        local_states = {}
+        if devices:
+            local_states = await self.api.get_local_states(devices)
+        if devices and all(
+            (device["id"], device["signal"]) in local_states for device in devices
+        ):
+            devices = self._merge(self.cache.devices, local_states)
+            self.cache.update(devices, confirmed=local_states)
+            self.telemetry.record(devices)
+            # Updated in place, only the polling tier's listeners are notified
+            self.data = devices
+            return
+        max_age = max(max_age, self.min_cloud_interval).total_seconds()
+        if time.monotonic() - self._last_refresh < max_age:
+            return
+        async with self._tier_refresh_lock:
+            # Another tier may have refreshed while this one waited
+            if time.monotonic() - self._last_refresh < max_age:
+                return
+            # The tier was just read, the refresh reuses it instead of the LAN
+            self._pending_local_states = local_states
+            try:
+                await self.async_refresh()
+            finally:
+                self._pending_local_states = None
+
+    async def _async_fetch_data(self) -> DeviceSnapshot:
+        """Fetch data from the LAN and, when needed, from the API.
+
+        When every channel may be read locally the LAN is tried first and
+        the cloud only on a miss; otherwise both are read concurrently, so
+        local timeouts do not add to the cloud poll.
+        """
+        priority, self._refresh_priority = self._refresh_priority, PRIORITY_POLL
+        local_states, self._pending_local_states = self._pending_local_states, None
+
+        if local_states is None and self._may_skip_cloud():
+            local_states = await self.api.get_local_states(self.cache.devices)
+            if self._all_local(local_states):
+                _LOGGER.debug("All devices read locally, skipping cloud poll")
+                devices = self._merge(self.cache.devices, local_states)
+                self.cache.update(devices)
+                self.telemetry.record(devices)
+                self._set_stale(False)
+                return devices
+
+        local_reads: asyncio.Task[dict[tuple[str, str], int]] | None = None
+        if local_states is None:
+            local_states = {}
+            if self.cache.devices:
+                local_reads = asyncio.create_task(
+                    self.api.get_local_states(self.cache.devices)
+                )
+
+        try:
+            devices = await self.api.get_devices(priority=priority)
+        except TokenExpiredError as err:
+            if local_reads:
+                local_reads.cancel()
+            _LOGGER.error("Token expired: %s", err)
+            raise UpdateFailed(
+                "Token expired. Please reconfigure the integration."
+            ) from err
+        except asyncio.CancelledError:
+            if local_reads:
+                local_reads.cancel()
+            raise
+        except Exception as err:
+            if local_reads:
+                local_states = await local_reads
+            return self._serve_stale(err, local_states)
+
+        if local_reads:
+            local_states = await local_reads
+        self._last_cloud_update = time.monotonic()
+        _LOGGER.debug("Fetched %d devices from Ujin API", len(devices))
+        devices = self._merge(devices, local_states)
+        self.cache.update(devices)
+        self.telemetry.record(devices)
+        self._set_stale(False)
+        return devices
+
+    def _serve_stale(
+        self, err: Exception, local_states: dict[tuple[str, str], int]
+    ) -> DeviceSnapshot:
+        """Serve cached data while the cloud is unreachable.
+
+        Raises UpdateFailed once the cache is older than the staleness
+        budget and no device could be read locally either.
+        """
+        if not self.cache.devices or (not self.cache.is_fresh and not local_states):
+            _LOGGER.error("Error communicating with API: %s", err)
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+
+        if not self.serving_stale:
+            _LOGGER.warning(
+                "Error communicating with API (%s), serving cached state from %s",
+                err, self.cache.updated,
+            )
+        devices = self._merge(self.cache.devices, local_states)
+        self.cache.update(devices, confirmed=local_states)
+        self._set_stale(True)
+        return devices
+
+    def _set_stale(self, stale: bool) -> None:
+        """Switch between normal polling and faster revalidation."""
+        if stale == self.serving_stale:
+            return
+        self.serving_stale = stale
+        if stale:
+            self.update_interval = timedelta(seconds=STALE_RETRY_INTERVAL)
+        else:
+            _LOGGER.info("Connection to Ujin API restored")
+            self.update_interval = self._normal_interval
+
+    def get_device(self, device_id: str, signal: str) -> Mapping[str, Any] | None:
+        """Return the current data of a channel."""
+        if self._indexed_data is not self.data:
+            self._index = {
+                (device["id"], device["signal"]): device for device in self.data or ()
+            }
+            self._indexed_data = self.data
+        return self._index.get((device_id, signal))
+
+    def is_device_fresh(self, device_id: str, signal: str) -> bool:
+        """Return True if a device state is recent enough to be trusted."""
+        return self.cache.is_device_fresh(device_id, signal)
+
+    def last_confirmed(self, device_id: str, signal: str) -> datetime | None:
+        """Return when a device state was last confirmed."""
+        return self.cache.last_confirmed(device_id, signal)
+
+    def _may_skip_cloud(self) -> bool:
+        """Return True if the LAN alone may serve this refresh.
+
+        That needs a recent cloud poll and every channel to be readable
+        locally; channels without controls never are.
+        """
+        return bool(self.cache.devices) and (
+            time.monotonic() - self._last_cloud_update < CLOUD_RESYNC_INTERVAL
+        ) and all(
+            device.get("controls") and self.api.is_locally_reachable(device["id"])
+            for device in self.cache.devices
+        )
+
+    def _all_local(self, local_states: dict[tuple[str, str], int]) -> bool:
+        """Return True if every channel answered locally.
+
+        Channels without controls (sensors, leak controllers) are only read
+        from the cloud, so any of them keeps the cloud poll running.
+        """
+        return all(
+            (device["id"], device["signal"]) in local_states
+            for device in self.cache.devices
+        )
+
+    @staticmethod
+    def _merge(
+        devices: DeviceSnapshot, local_states: dict[tuple[str, str], int]
+    ) -> DeviceSnapshot:
+        """Overlay values read from the LAN on top of device data."""
+        if not local_states:
+            return devices
+        merged = []
+        changed = False
+        for device in devices:
+            value = local_states.get((device["id"], device["signal"]))
+            if (
+                value is not None
+                and device.get("controls")
+                and (
+                    device.get("status") != "ok"
+                    or device["controls"][0].get("value") != value
+                )
+            ):
+                device = _with_control_value(device, value)
+                changed = True
+            merged.append(device)
+        # Unchanged data keeps its identity, so listeners are not notified
+        return tuple(merged) if changed else devices
+
+
+class UjinTierCoordinator(DataUpdateCoordinator[DeviceSnapshot]):
+    """Polling schedule for one tier of channels.
+
+    Holds no state of its own: refreshes go through the shared device
+    store, and data is the tier's slice of it. Entities of the tier only
+    listen here, so a poll of one tier does not update the others.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        store: UjinDataUpdateCoordinator,
+        tier: str,
+        update_interval: timedelta,
+    ) -> None:
+        """Initialize the tier coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{tier}",
+            update_interval=update_interval,
+            always_update=False,
+        )
+        self.store = store
+        self.tier = tier
+        self.data = store.tier_devices(tier)
+        self._polling = False
+        # Set while the first poll is held off, see async_delay_start
+        self._unsub_start: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_delay_start(self, delay: float) -> CALLBACK_TYPE:
+        """Hold off polling for a while, then poll at the regular interval.
+
+        update_interval keeps its value meanwhile, only scheduling waits.
+        """
+
+        @callback
+        def async_start(_now: datetime) -> None:
+            self._unsub_start = None
+            self.hass.async_create_task(self.async_refresh())
+
+        self._unschedule_refresh()
+        self._unsub_start = async_call_later(self.hass, delay, async_start)
+
+        @callback
+        def async_cancel_start() -> None:
+            if self._unsub_start:
+                self._unsub_start()
+                self._unsub_start = None
+
+        return async_cancel_start
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll, unless the first one is still held off."""
+        if self._unsub_start:
+            return
+        super()._schedule_refresh()
+
+    async def _async_update_data(self) -> DeviceSnapshot:
+        """Poll the tier through the device store."""
+        self._polling = True
+        try:
+            await self.store.async_poll_tier(self.tier, self.update_interval)
+        finally:
+            self._polling = False
+        if not self.store.last_update_success:
+            raise UpdateFailed(f"Error updating Ujin devices: {self.store.last_exception}")
+        self.always_update = self.store.serving_stale
+        return self.store.tier_devices(self.tier)
+
+    @callback
+    def handle_store_update(self) -> None:
+        """Pass a refresh of the whole store on to the tier's entities."""
+        if self._polling:
+            # Our own poll triggered it, _async_update_data returns the data
+            return
+        if self.store.last_update_success:
+            self.async_set_updated_data(self.store.tier_devices(self.tier))
+        elif self.last_update_success:
+            self.last_update_success = False
+            self.async_update_listeners()
+
+    @property
+    def cache(self) -> UjinDeviceCache:
+        """Return the shared device cache."""
+        return self.store.cache
+
+    @property
+    def serving_stale(self) -> bool:
+        """Return True while the store serves cached data."""
+        return self.store.serving_stale
+
+    def get_device(self, device_id: str, signal: str) -> Mapping[str, Any] | None:
+        """Return the current data of a channel."""
+        return self.store.get_device(device_id, signal)
+
+    def is_device_fresh(self, device_id: str, signal: str) -> bool:
+        """Return True if a device state is recent enough to be trusted."""
+        return self.store.is_device_fresh(device_id, signal)
+
+    def last_confirmed(self, device_id: str, signal: str) -> datetime | None:
+        """Return when a device state was last confirmed."""
+        return self.store.last_confirmed(device_id, signal)
+
+
+class UjinAutoscriptCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
+    """Slowly refreshed list of the account's server-side autoscripts."""
+
+    def __init__(self, hass: HomeAssistant, api: UjinApiClient) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_autoscripts",
+            update_interval=timedelta(seconds=AUTOSCRIPTS_REFRESH_INTERVAL),
+        )
+        self.api = api
+
+    async def _async_update_data(self) -> list[dict[str, Any]]:
+        """Fetch the autoscript list, keeping the last one on errors."""
+        try:
+            return await self.api.get_autoscripts()
+        except TokenExpiredError as err:
+            raise UpdateFailed(
+                "Token expired. Please reconfigure the integration."
+            ) from err
+        except UjinApiError as err:
+            if self.data is None:
+                raise UpdateFailed(f"Error fetching autoscripts: {err}") from err
+            _LOGGER.warning("Error fetching autoscripts (%s), keeping cached list", err)
+            return self.data
@@ -0,0 +1,66 @@
+"""Diagnostics support for Ujin Smart Home."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {CONF_EMAIL, "token", "user_token", "area_guid"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN].entries[entry.entry_id]
+    api = entry_data["api"]
+    coordinator = entry_data["coordinator"]
+    websocket = entry_data["websocket"]
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "api": {
+            "host": api.base_url,
+            "hosts": api.hosts,
+            "endpoints": api.metrics.as_dict(),
+            "devices_snapshot": api.snapshot_metrics.as_dict(),
+            "devices_parse": {
+                "threshold_bytes": api.parse_threshold,
+                **api.parse_metrics.as_dict(),
+            },
+            "rate_limiter": api.rate_limiter.get_stats(),
+            "routes": api.get_route_stats(),
+        },
+        "websocket": websocket.metrics.as_dict() if websocket else None,
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval else None
+            ),
+            "serving_stale": coordinator.serving_stale,
+            "cache_updated": (
+                coordinator.cache.updated.isoformat()
+                if coordinator.cache.updated else None
+            ),
+            "channels": len(coordinator.data or []),
+            "cycles": coordinator.metrics.as_dict(),
+            "telemetry_series": len(coordinator.telemetry),
+            "tiers": {
+                tier: {
+                    "update_interval": tier_coordinator.update_interval.total_seconds(),
+                    "channels": len(tier_coordinator.data or []),
+                    "last_update_success": tier_coordinator.last_update_success,
+                }
+                for tier, tier_coordinator in coordinator.tiers.items()
+            },
+        },
+    }
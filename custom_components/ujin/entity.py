@@ -0,0 +1,105 @@
+"""Base entities for Ujin Smart Home."""
+from __future__ import annotations
+
+from abc import abstractmethod
+from typing import Any
+
+from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+
+
+def ujin_device_info(device_data: dict[str, Any]) -> DeviceInfo:
+    """Return device registry info for a Ujin device.
+
+    Static metadata lives here rather than in state attributes, so it is
+    stored once in the device registry instead of in every recorded state.
+    """
+    info = DeviceInfo(
+        identifiers={(DOMAIN, device_data["id"])},
+        name=device_data["device_name"],
+        manufacturer=device_data.get("specification", "Ujin"),
+        model=device_data.get("model_title", "Unknown"),
+        serial_number=device_data["id"],
+    )
+    room = device_data.get("room", {}).get("title")
+    if room:
+        info["suggested_area"] = room
+    return info
+
+
+def first_channels(devices: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return the first channel of every physical device."""
+    channels: dict[str, dict[str, Any]] = {}
+    for device in devices:
+        channels.setdefault(device["id"], device)
+    return list(channels.values())
+
+
+class UjinEntity(CoordinatorEntity):
+    """Entity bound to one channel of a Ujin device."""
+
+    def __init__(self, coordinator, device_data: dict[str, Any]) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._device_data = device_data
+        self._attr_device_info = ujin_device_info(device_data)
+
+    @property
+    def device(self) -> dict[str, Any] | None:
+        """Return the current coordinator data of the channel."""
+        return self.coordinator.get_device(
+            self._device_data["id"], self._device_data["signal"]
+        )
+
+
+class UjinDeviceDiagnosticEntity(UjinEntity):
+    """Diagnostic value of a Ujin device, written only when it changes."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, device_data: dict[str, Any], key: str) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator, device_data)
+        self._attr_unique_id = f"{device_data['id']}_{key}"
+        self._written: tuple[bool, Any] | None = None
+
+    @property
+    def available(self) -> bool:
+        """Return True while the device state can be trusted.
+
+        Freshness is only checked while cached data is served.
+        """
+        return (
+            super().available
+            and self.device is not None
+            and (
+                not self.coordinator.serving_stale
+                or self.coordinator.is_device_fresh(
+                    self._device_data["id"], self._device_data["signal"]
+                )
+            )
+        )
+
+    @abstractmethod
+    def _value(self, device: dict[str, Any]) -> Any:
+        """Return the entity value from device data."""
+
+    @property
+    def value(self) -> Any:
+        """Return the current value, None if the channel is gone."""
+        device = self.device
+        return self._value(device) if device is not None else None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if availability or the value changed."""
+        current = (self.available, self.value)
+        if current == self._written:
+            return
+        self._written = current
+        self.async_write_ha_state()
@@ -0,0 +1,92 @@
+"""Resources shared by all Ujin Smart Home config entries."""
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DOMAIN, POLL_STAGGER
+from .websocket import UjinWebSocketClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UjinHub:
+    """Connection pool, WebSocket connections and poll slots of all accounts.
+
+    Every entry's API and WebSocket clients use Home Assistant's shared
+    aiohttp session, so connections and TLS sessions are pooled. Entries
+    subscribing to the same WebSocket URL share one connection; the URL
+    carries the account token, so only entries of the same account and
+    apartment ever do. Each entry gets a poll slot, used to offset its
+    timers from other entries.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.session = async_get_clientsession(hass)
+        # Runtime data of loaded entries, by entry id
+        self.entries: dict[str, dict[str, Any]] = {}
+        self._websockets: dict[str, UjinWebSocketClient] = {}
+        # url -> entry id -> message callback
+        self._subscribers: dict[str, dict[str, Callable[[dict[str, Any]], None]]] = {}
+        self._poll_slots: dict[str, int] = {}
+
+    def poll_slot(self, entry_id: str) -> int:
+        """Return the poll slot of an entry, reusing freed slots."""
+        if entry_id not in self._poll_slots:
+            used = set(self._poll_slots.values())
+            self._poll_slots[entry_id] = next(
+                slot for slot in range(len(used) + 1) if slot not in used
+            )
+        return self._poll_slots[entry_id]
+
+    def poll_delay(self, entry_id: str, interval: float) -> float:
+        """Return how long to delay an entry's first poll of an interval."""
+        return (self.poll_slot(entry_id) * POLL_STAGGER) % interval
+
+    async def async_subscribe_websocket(
+        self,
+        entry_id: str,
+        url: str,
+        on_message: Callable[[dict[str, Any]], None],
+    ) -> UjinWebSocketClient:
+        """Subscribe an entry to a WebSocket URL, connecting if needed."""
+        subscribers = self._subscribers.setdefault(url, {})
+        subscribers[entry_id] = on_message
+        if url in self._websockets:
+            _LOGGER.debug("Sharing WebSocket connection to %s", url)
+            return self._websockets[url]
+
+        @callback
+        def dispatch(data: dict[str, Any]) -> None:
+            """Pass a message to every subscribed entry."""
+            for handler in list(subscribers.values()):
+                handler(data)
+
+        client = UjinWebSocketClient(url=url, on_message=dispatch, session=self.session)
+        self._websockets[url] = client
+        await client.connect()
+        return client
+
+    async def async_unload_entry(self, entry_id: str) -> None:
+        """Release the WebSocket subscription and poll slot of an entry."""
+        self.entries.pop(entry_id, None)
+        self._poll_slots.pop(entry_id, None)
+        for url, subscribers in list(self._subscribers.items()):
+            if subscribers.pop(entry_id, None) is None or subscribers:
+                continue
+            del self._subscribers[url]
+            await self._websockets.pop(url).disconnect()
+            _LOGGER.info("WebSocket disconnected")
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> UjinHub:
+    """Return the hub, creating it on first use."""
+    if DOMAIN not in hass.data:
+        hass.data[DOMAIN] = UjinHub(hass)
+    return hass.data[DOMAIN]
@@ -0,0 +1,163 @@
+"""Local (LAN) transport for Ujin devices over sapfir-unicast."""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+from typing import Any
+
+from .const import LOCAL_COMMAND_TIMEOUT, LOCAL_MAX_CONCURRENT, LOCAL_PROTOCOL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LocalTransportError(Exception):
+    """Exception raised when a device cannot be reached on the LAN."""
+    pass
+
+
+def get_local_endpoint(device: dict[str, Any]) -> dict[str, Any] | None:
+    """Return the usable local endpoint of a device, if any.
+
+    Devices advertise it in `management.local` of the devices/main payload.
+    """
+    local = device.get("management", {}).get("local") or {}
+    if not local.get("available"):
+        return None
+    if local.get("protocol") != LOCAL_PROTOCOL:
+        return None
+    if not local.get("ip") or not local.get("port"):
+        return None
+    return {
+        "ip": local["ip"],
+        "port": int(local["port"]),
+        "token": local.get("token", ""),
+    }
+
+
+class _SapfirUnicastProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol waiting for a single reply to a request."""
+
+    def __init__(self, request_id: int) -> None:
+        """Initialize the protocol."""
+        self._request_id = request_id
+        self.reply: asyncio.Future[dict[str, Any]] = (
+            asyncio.get_running_loop().create_future()
+        )
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Handle a datagram from the device."""
+        try:
+            message = json.loads(data)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            _LOGGER.debug("Ignoring malformed datagram from %s: %r", addr, data)
+            return
+
+        # Stale replies to earlier requests can still arrive, skip them
+        if message.get("id") != self._request_id:
+            return
+
+        if not self.reply.done():
+            self.reply.set_result(message)
+
+    def error_received(self, exc: Exception) -> None:
+        """Handle ICMP errors such as port unreachable."""
+        if not self.reply.done():
+            self.reply.set_exception(LocalTransportError(str(exc)))
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Handle the socket being closed."""
+        if not self.reply.done():
+            self.reply.set_exception(LocalTransportError("Socket closed"))
+
+
+class UjinLocalClient:
+    """Client sending requests straight to devices on the LAN.
+
+    Every request is a JSON datagram carrying the device token from
+    `management.local`; the device answers with a datagram echoing the
+    request id and an `error` code (0 on success). At most `max_concurrent`
+    requests (and so datagram sockets) are in flight at once.
+    """
+
+    def __init__(
+        self,
+        timeout: float = LOCAL_COMMAND_TIMEOUT,
+        max_concurrent: int = LOCAL_MAX_CONCURRENT,
+    ) -> None:
+        """Initialize the local client."""
+        self._timeout = timeout
+        self._request_ids = itertools.count(1)
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    async def _exchange(
+        self, endpoint: dict[str, Any], payload: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Send a request to a device and wait for its reply."""
+        async with self._slots:
+            return await self._exchange_one(endpoint, payload)
+
+    async def _exchange_one(
+        self, endpoint: dict[str, Any], payload: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Exchange a single request/reply pair over a new socket."""
+        loop = asyncio.get_running_loop()
+        request_id = next(self._request_ids)
+        message = {"id": request_id, "token": endpoint["token"], **payload}
+
+        try:
+            transport, protocol = await loop.create_datagram_endpoint(
+                lambda: _SapfirUnicastProtocol(request_id),
+                remote_addr=(endpoint["ip"], endpoint["port"]),
+            )
+        except OSError as err:
+            raise LocalTransportError(str(err)) from err
+
+        try:
+            transport.sendto(json.dumps(message).encode())
+            reply = await asyncio.wait_for(protocol.reply, self._timeout)
+        except asyncio.TimeoutError as err:
+            raise LocalTransportError(
+                f"No reply from {endpoint['ip']}:{endpoint['port']}"
+            ) from err
+        finally:
+            transport.close()
+
+        if reply.get("error", 0) != 0:
+            raise LocalTransportError(reply.get("message") or "Device error")
+        return reply
+
+    async def send_command(
+        self, endpoint: dict[str, Any], device_id: str, signal: str, state: int
+    ) -> None:
+        """Send a command to a device on the LAN.
+
+        Raises LocalTransportError if the device did not acknowledge it.
+        """
+        await self._exchange(
+            endpoint,
+            {
+                "command": "send-signal",
+                "serialnumber": device_id,
+                "signal": signal,
+                "state": state,
+            },
+        )
+        _LOGGER.debug(
+            "Local command delivered to %s (%s:%s)",
+            device_id, endpoint["ip"], endpoint["port"],
+        )
+
+    async def get_state(self, endpoint: dict[str, Any], signal: str) -> int:
+        """Read the current value of a device signal from the LAN.
+
+        Raises LocalTransportError if the device did not answer.
+        """
+        reply = await self._exchange(
+            endpoint, {"command": "get-state", "signal": signal}
+        )
+        try:
+            return int(reply["state"])
+        except (KeyError, TypeError, ValueError) as err:
+            raise LocalTransportError(f"Invalid state reply: {reply}") from err
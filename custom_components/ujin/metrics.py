@@ -0,0 +1,259 @@
+"""Runtime metrics for Ujin Smart Home."""
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any
+
+# Upper bounds of request latency histogram buckets, seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Window over which message rates are computed, seconds
+RATE_WINDOW = 60
+
+
+class EndpointMetrics:
+    """Request count, errors and latency histogram of one endpoint."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.requests = 0
+        self.errors = 0  # transport failures, HTTP 5xx and undecodable bodies
+        self.api_errors = 0  # answered with error != 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_time: float | None = None
+        # One bucket per bound plus overflow
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, elapsed: float, error: bool, api_error: bool) -> None:
+        """Record one request."""
+        self.requests += 1
+        if error:
+            self.errors += 1
+            return
+        if api_error:
+            self.api_errors += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.last_time = elapsed
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    @property
+    def mean_time(self) -> float | None:
+        """Return the mean latency of completed requests."""
+        completed = self.requests - self.errors
+        return self.total_time / completed if completed else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dictionary."""
+        histogram = {f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.buckets)}
+        histogram["le_inf"] = self.buckets[-1]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "api_errors": self.api_errors,
+            "mean_ms": self.mean_time * 1000 if self.mean_time is not None else None,
+            "max_ms": self.max_time * 1000,
+            "last_ms": self.last_time * 1000 if self.last_time is not None else None,
+            "histogram": histogram,
+        }
+
+
+class RequestMetrics:
+    """Per-endpoint request metrics of an API client."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+
+    def record(
+        self, endpoint: str, elapsed: float, error: bool = False, api_error: bool = False
+    ) -> None:
+        """Record one request to an endpoint."""
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = EndpointMetrics()
+        self.endpoints[endpoint].record(elapsed, error, api_error)
+
+    def get(self, endpoint: str) -> EndpointMetrics | None:
+        """Return the metrics of an endpoint, if it was called."""
+        return self.endpoints.get(endpoint)
+
+    @property
+    def errors(self) -> int:
+        """Return the number of failed requests across endpoints."""
+        return sum(metrics.errors + metrics.api_errors for metrics in self.endpoints.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dictionary."""
+        return {endpoint: metrics.as_dict() for endpoint, metrics in self.endpoints.items()}
+
+
+class SnapshotMetrics:
+    """How often a polled response was unchanged and reused."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.hits = 0
+        self.not_modified = 0  # hits answered with 304 Not Modified
+        self.misses = 0
+
+    def record_hit(self, not_modified: bool = False) -> None:
+        """Record a response identical to the previous one."""
+        self.hits += 1
+        if not_modified:
+            self.not_modified += 1
+
+    def record_miss(self) -> None:
+        """Record a response that had to be parsed."""
+        self.misses += 1
+
+    @property
+    def hit_ratio(self) -> float | None:
+        """Return the share of reused responses."""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dictionary."""
+        return {
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+class ParseMetrics:
+    """Time spent decoding devices/main responses, and where."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.inline = 0
+        self.offloaded = 0
+        self.last_bytes = 0
+        self.last_duration: float | None = None
+        # Event loop time blocked by inline parsing
+        self.last_blocking: float | None = None
+        self.max_blocking = 0.0
+
+    def record(self, size: int, duration: float, offloaded: bool) -> None:
+        """Record one parsed response."""
+        self.last_bytes = size
+        self.last_duration = duration
+        if offloaded:
+            self.offloaded += 1
+            return
+        self.inline += 1
+        self.last_blocking = duration
+        self.max_blocking = max(self.max_blocking, duration)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dictionary."""
+        return {
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+            "last_bytes": self.last_bytes,
+            "last_ms": self.last_duration * 1000 if self.last_duration is not None else None,
+            "last_blocking_ms": (
+                self.last_blocking * 1000 if self.last_blocking is not None else None
+            ),
+            "max_blocking_ms": self.max_blocking * 1000,
+        }
+
+
+class WebSocketMetrics:
+    """Message rate, reconnects and frame age of a WebSocket client."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.messages = 0
+        self.reconnects = 0
+        self.last_message: float | None = None
+        self._recent: deque[float] = deque()
+
+    def record_message(self) -> None:
+        """Record a received frame."""
+        now = time.monotonic()
+        self.messages += 1
+        self.last_message = now
+        self._recent.append(now)
+        self._trim(now)
+
+    def record_reconnect(self) -> None:
+        """Record a reconnect attempt."""
+        self.reconnects += 1
+
+    def _trim(self, now: float) -> None:
+        """Drop timestamps older than the rate window."""
+        while self._recent and now - self._recent[0] > RATE_WINDOW:
+            self._recent.popleft()
+
+    @property
+    def messages_per_second(self) -> float:
+        """Return the message rate over the last minute."""
+        self._trim(time.monotonic())
+        return len(self._recent) / RATE_WINDOW
+
+    @property
+    def seconds_since_last_message(self) -> float | None:
+        """Return the age of the last frame."""
+        if self.last_message is None:
+            return None
+        return time.monotonic() - self.last_message
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dictionary."""
+        return {
+            "messages": self.messages,
+            "messages_per_second": self.messages_per_second,
+            "reconnects": self.reconnects,
+            "seconds_since_last_message": self.seconds_since_last_message,
+        }
+
+
+class CycleMetrics:
+    """Duration of coordinator update cycles and entity fan-out."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.cycles = 0
+        self.failures = 0
+        self.last_duration: float | None = None
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.fanouts = 0
+        self.last_fanout: float | None = None
+        self.max_fanout = 0.0
+
+    def record_cycle(self, duration: float, success: bool) -> None:
+        """Record one update cycle."""
+        self.cycles += 1
+        if not success:
+            self.failures += 1
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+        self.total_duration += duration
+
+    def record_fanout(self, duration: float) -> None:
+        """Record one listener fan-out."""
+        self.fanouts += 1
+        self.last_fanout = duration
+        self.max_fanout = max(self.max_fanout, duration)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dictionary."""
+        return {
+            "cycles": self.cycles,
+            "failures": self.failures,
+            "last_ms": self.last_duration * 1000 if self.last_duration is not None else None,
+            "mean_ms": self.total_duration / self.cycles * 1000 if self.cycles else None,
+            "max_ms": self.max_duration * 1000,
+            "fanouts": self.fanouts,
+            "last_fanout_ms": self.last_fanout * 1000 if self.last_fanout is not None else None,
+            "max_fanout_ms": self.max_fanout * 1000,
+        }
@@ -0,0 +1,98 @@
+"""On-demand profiling of the Ujin update and message handling paths."""
+from __future__ import annotations
+
+import io
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import cProfile
+    import pstats
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of entries in the text summary
+SUMMARY_LINES = 40
+
+
+class UjinProfiler:
+    """cProfile wrapper enabled only around instrumented sections.
+
+    Call sites check `active` before entering a section, so nothing is
+    done while no profiling session is running. Sections may nest (the
+    WebSocket handler can run while an update cycle awaits I/O); the
+    profiler stays enabled until the outermost section exits.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the profiler."""
+        self.active = False
+        self._profile: cProfile.Profile | None = None
+        self._depth = 0
+
+    def start(self) -> None:
+        """Start a profiling session."""
+        # Imported on first use, profiling is rare
+        import cProfile
+
+        self._profile = cProfile.Profile()
+        self._depth = 0
+        self.active = True
+
+    def stop(self) -> pstats.Stats | None:
+        """Stop the session and return the collected statistics."""
+        if not self.active or self._profile is None:
+            return None
+        self.active = False
+        if self._depth:
+            self._profile.disable()
+            self._depth = 0
+        profile, self._profile = self._profile, None
+        import pstats
+
+        try:
+            return pstats.Stats(profile)
+        except TypeError:
+            # No section ran while profiling
+            return None
+
+    def enter(self) -> None:
+        """Enter an instrumented section."""
+        if not self.active:
+            return
+        if self._depth == 0:
+            self._profile.enable()
+        self._depth += 1
+
+    def exit(self) -> None:
+        """Exit an instrumented section."""
+        if not self.active or self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            self._profile.disable()
+
+
+PROFILER = UjinProfiler()
+
+
+def write_profile(stats: pstats.Stats, prof_path: str, summary_path: str) -> None:
+    """Write a pstats dump and a text summary of the slowest call paths.
+
+    Does blocking I/O, run it in an executor.
+    """
+    import pstats
+
+    stats.dump_stats(prof_path)
+
+    output = io.StringIO()
+    stats.stream = output
+    output.write("Slowest functions by cumulative time\n\n")
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LINES)
+    output.write("\nSlowest functions by own time\n\n")
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(SUMMARY_LINES)
+    output.write("\nCall paths into the slowest Ujin functions\n\n")
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_callers("ujin", 15)
+
+    with open(summary_path, "w", encoding="utf-8") as file:
+        file.write(output.getvalue())
@@ -0,0 +1,139 @@
+"""Client-side rate limiting for the Ujin cloud API."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any
+
+from .const import (
+    PRIORITY_COMMAND,
+    PRIORITY_NAMES,
+    PRIORITY_POLL,
+    PRIORITY_REFRESH,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UjinRateLimiter:
+    """Token bucket rate limiter with priority classes.
+
+    Requests wait for a token; when several are waiting, tokens go to the
+    highest priority first (interactive commands, then WebSocket-triggered
+    refreshes, then background polls) and in arrival order within a class.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize the rate limiter.
+
+        Args:
+            rate: Sustained requests per second
+            burst: Maximum number of requests sent back to back
+        """
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+        self._max_queue_depth = 0
+        self._stats = {
+            priority: {"requests": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for priority in (PRIORITY_COMMAND, PRIORITY_REFRESH, PRIORITY_POLL)
+        }
+
+    def configure(self, rate: float, burst: int) -> None:
+        """Change the budget without dropping queued requests."""
+        self._refill()
+        self._rate = rate
+        self._burst = burst
+        self._tokens = min(self._tokens, float(burst))
+        _LOGGER.debug("Rate limit set to %.2f req/s, burst %d", rate, burst)
+        self._dispatch()
+
+    def _refill(self) -> None:
+        """Add tokens accumulated since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            float(self._burst), self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        """Hand out available tokens to waiters in priority order."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        self._refill()
+
+        while self._waiters and self._tokens >= 1:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                # Cancelled while waiting
+                continue
+            self._tokens -= 1
+            waiter.set_result(None)
+
+        if self._waiters:
+            delay = (1 - self._tokens) / self._rate
+            self._wakeup = asyncio.get_running_loop().call_later(
+                delay, self._dispatch
+            )
+
+    async def acquire(self, priority: int = PRIORITY_POLL) -> None:
+        """Wait until a request of the given priority may be sent."""
+        start = time.monotonic()
+        self._refill()
+
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+            self._max_queue_depth = max(self._max_queue_depth, self.queue_depth)
+            if self._wakeup is None:
+                self._dispatch()
+            await waiter
+
+        wait = time.monotonic() - start
+        stats = self._stats[priority]
+        stats["requests"] += 1
+        stats["total_wait"] += wait
+        stats["max_wait"] = max(stats["max_wait"], wait)
+        if wait > 1:
+            _LOGGER.debug(
+                "%s request waited %.2f s for the rate limiter",
+                PRIORITY_NAMES[priority], wait,
+            )
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests currently waiting."""
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return queue depth and wait time metrics."""
+        self._refill()
+        return {
+            "rate": self._rate,
+            "burst": self._burst,
+            "tokens": round(self._tokens, 2),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self._max_queue_depth,
+            "priorities": {
+                PRIORITY_NAMES[priority]: {
+                    "requests": stats["requests"],
+                    "avg_wait": (
+                        stats["total_wait"] / stats["requests"]
+                        if stats["requests"] else 0.0
+                    ),
+                    "max_wait": stats["max_wait"],
+                }
+                for priority, stats in self._stats.items()
+            },
+        }
@@ -0,0 +1,91 @@
+"""Scene platform for Ujin Smart Home autoscripts."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.components.scene import Scene
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Ujin autoscript scenes from a config entry."""
+    entry_data = hass.data[DOMAIN].entries[entry.entry_id]
+    coordinator = entry_data["autoscripts"]
+    known: set[str] = set()
+
+    @callback
+    def async_add_new_autoscripts() -> None:
+        """Add scenes for autoscripts not seen before."""
+        new = [
+            autoscript for autoscript in coordinator.data or []
+            if str(autoscript["id"]) not in known
+        ]
+        known.update(str(autoscript["id"]) for autoscript in new)
+        if new:
+            async_add_entities(
+                UjinAutoscriptScene(entry, entry_data, autoscript)
+                for autoscript in new
+            )
+
+    async_add_new_autoscripts()
+    entry.async_on_unload(coordinator.async_add_listener(async_add_new_autoscripts))
+
+
+class UjinAutoscriptScene(CoordinatorEntity, Scene):
+    """Ujin autoscript, run by the cloud in a single request."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        entry_data: dict[str, Any],
+        autoscript: dict[str, Any],
+    ) -> None:
+        """Initialize the scene."""
+        super().__init__(entry_data["autoscripts"])
+        self._api = entry_data["api"]
+        self._devices = entry_data["coordinator"]
+        self._autoscript_id = str(autoscript["id"])
+        self._attr_unique_id = f"{entry.entry_id}_autoscript_{self._autoscript_id}"
+        self._attr_name = (
+            autoscript.get("title")
+            or autoscript.get("name")
+            or f"Autoscript {self._autoscript_id}"
+        )
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": entry.title,
+            "manufacturer": "Ujin",
+            "model": "Cloud API",
+            "entry_type": DeviceEntryType.SERVICE,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return True while the autoscript exists on the server."""
+        return super().available and any(
+            str(autoscript["id"]) == self._autoscript_id
+            for autoscript in self.coordinator.data or []
+        )
+
+    async def async_activate(self, **kwargs: Any) -> None:
+        """Run the autoscript."""
+        if not await self._api.run_autoscript(self._autoscript_id):
+            raise HomeAssistantError(f"Failed to run Ujin autoscript {self._attr_name}")
+        # Pick up the switched devices without waiting for the next poll
+        await self._devices.async_request_resync()
@@ -0,0 +1,212 @@
+"""Sensor platform for Ujin Smart Home."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, PERCENTAGE, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import API_DEVICES_MAIN, API_SEND_SIGNAL, DOMAIN
+from .entity import UjinDeviceDiagnosticEntity, first_channels
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _endpoint_mean_ms(endpoint: str) -> Callable[[dict[str, Any]], float | None]:
+    """Return a getter for the mean latency of an endpoint."""
+    def getter(entry_data: dict[str, Any]) -> float | None:
+        metrics = entry_data["api"].metrics.get(endpoint)
+        if metrics is None or metrics.mean_time is None:
+            return None
+        return round(metrics.mean_time * 1000, 1)
+    return getter
+
+
+def _websocket_metric(name: str) -> Callable[[dict[str, Any]], Any]:
+    """Return a getter for a WebSocket metric."""
+    def getter(entry_data: dict[str, Any]) -> Any:
+        websocket = entry_data["websocket"]
+        if websocket is None:
+            return None
+        value = getattr(websocket.metrics, name)
+        return round(value, 2) if isinstance(value, float) else value
+    return getter
+
+
+def _cycle_ms(entry_data: dict[str, Any]) -> float | None:
+    """Return the duration of the last coordinator cycle."""
+    duration = entry_data["coordinator"].metrics.last_duration
+    return round(duration * 1000, 1) if duration is not None else None
+
+
+def _snapshot_hit_ratio(entry_data: dict[str, Any]) -> float | None:
+    """Return the share of unchanged devices responses, in percent."""
+    ratio = entry_data["api"].snapshot_metrics.hit_ratio
+    return round(ratio * 100, 1) if ratio is not None else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class UjinDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes a Ujin diagnostic sensor."""
+
+    value_fn: Callable[[dict[str, Any]], Any]
+
+
+DIAGNOSTIC_SENSORS: tuple[UjinDiagnosticSensorEntityDescription, ...] = (
+    UjinDiagnosticSensorEntityDescription(
+        key="devices_latency",
+        name="Devices request latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_endpoint_mean_ms(API_DEVICES_MAIN),
+    ),
+    UjinDiagnosticSensorEntityDescription(
+        key="command_latency",
+        name="Command request latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_endpoint_mean_ms(API_SEND_SIGNAL),
+    ),
+    UjinDiagnosticSensorEntityDescription(
+        key="api_errors",
+        name="API errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda entry_data: entry_data["api"].metrics.errors,
+    ),
+    UjinDiagnosticSensorEntityDescription(
+        key="update_cycle",
+        name="Update cycle duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_cycle_ms,
+    ),
+    UjinDiagnosticSensorEntityDescription(
+        key="devices_unchanged",
+        name="Unchanged devices responses",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_snapshot_hit_ratio,
+    ),
+    UjinDiagnosticSensorEntityDescription(
+        key="websocket_rate",
+        name="WebSocket messages per second",
+        native_unit_of_measurement="msg/s",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_websocket_metric("messages_per_second"),
+    ),
+    UjinDiagnosticSensorEntityDescription(
+        key="websocket_reconnects",
+        name="WebSocket reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=_websocket_metric("reconnects"),
+    ),
+    UjinDiagnosticSensorEntityDescription(
+        key="websocket_last_message",
+        name="Time since last WebSocket message",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_websocket_metric("seconds_since_last_message"),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Ujin sensors from a config entry."""
+    entry_data = hass.data[DOMAIN].entries[entry.entry_id]
+    coordinator = entry_data["coordinator"]
+
+    entities: list[SensorEntity] = [
+        UjinDiagnosticSensor(entry, entry_data, description)
+        for description in DIAGNOSTIC_SENSORS
+    ]
+    entities.extend(
+        UjinLocalIpSensor(coordinator.tier_for(device), device)
+        for device in first_channels(coordinator.data)
+        if device.get("management", {}).get("local")
+    )
+    async_add_entities(entities)
+
+
+class UjinDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Integration health metric, refreshed with every coordinator cycle."""
+
+    entity_description: UjinDiagnosticSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        entry_data: dict[str, Any],
+        description: UjinDiagnosticSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(entry_data["coordinator"])
+        self.entity_description = description
+        self._entry_data = entry_data
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": entry.title,
+            "manufacturer": "Ujin",
+            "model": "Cloud API",
+            "entry_type": DeviceEntryType.SERVICE,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Write the metrics after every cycle, even if no data changed."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_cycle_listener(self.async_write_ha_state)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Ignore data updates, the cycle listener writes the state."""
+
+    @property
+    def available(self) -> bool:
+        """Return True, metrics are available even when updates fail."""
+        return True
+
+    @property
+    def native_value(self) -> Any:
+        """Return the current metric value."""
+        return self.entity_description.value_fn(self._entry_data)
+
+
+class UjinLocalIpSensor(UjinDeviceDiagnosticEntity, SensorEntity):
+    """LAN address of a Ujin device, as reported by the cloud."""
+
+    _attr_name = "Local IP"
+    _attr_icon = "mdi:ip-network"
+
+    def __init__(self, coordinator, device_data: dict[str, Any]) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, device_data, "local_ip")
+
+    def _value(self, device: dict[str, Any]) -> str | None:
+        """Return the local IP address of the device."""
+        return device.get("management", {}).get("local", {}).get("ip")
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the local IP address."""
+        return self.value
@@ -0,0 +1,124 @@
+"""Services for the Ujin Smart Home integration."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    ATTR_DURATION,
+    DEFAULT_PROFILE_DURATION,
+    DEFAULT_RECORD_DURATION,
+    DOMAIN,
+    SERVICE_PROFILE,
+    SERVICE_RECORD_TRAFFIC,
+)
+from .profiler import PROFILER, write_profile
+from .traffic import UjinTrafficRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORD_TRAFFIC_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_RECORD_DURATION): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
+
+def _clients(hass: HomeAssistant) -> list:
+    """Return API and WebSocket clients of all loaded entries."""
+    clients = []
+    if DOMAIN not in hass.data:
+        return clients
+    for entry_data in hass.data[DOMAIN].entries.values():
+        clients.append(entry_data["api"])
+        # Entries may share a WebSocket connection
+        if entry_data.get("websocket") and entry_data["websocket"] not in clients:
+            clients.append(entry_data["websocket"])
+    return clients
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register integration services."""
+    if hass.services.has_service(DOMAIN, SERVICE_RECORD_TRAFFIC):
+        return
+
+    async def async_record_traffic(call: ServiceCall) -> None:
+        """Capture REST responses and WebSocket frames for a while."""
+        clients = _clients(hass)
+        if any(client.recorder for client in clients):
+            raise HomeAssistantError("A traffic capture is already running")
+
+        duration = call.data[ATTR_DURATION]
+        recorder = UjinTrafficRecorder()
+        for client in clients:
+            client.recorder = recorder
+        _LOGGER.info("Recording Ujin traffic for %d seconds", duration)
+
+        async def async_finish(now: datetime) -> None:
+            """Stop recording and write the capture to the config directory."""
+            for client in clients:
+                if client.recorder is recorder:
+                    client.recorder = None
+            path = hass.config.path(
+                f"ujin_traffic_{now.strftime('%Y%m%d_%H%M%S')}.jsonl"
+            )
+            count = await hass.async_add_executor_job(recorder.dump, path)
+            _LOGGER.info("Wrote %d traffic record(s) to %s", count, path)
+
+        async_call_later(hass, duration, async_finish)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_TRAFFIC,
+        async_record_traffic,
+        schema=RECORD_TRAFFIC_SCHEMA,
+    )
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile update cycles, entity fan-out and WebSocket handling."""
+        if PROFILER.active:
+            raise HomeAssistantError("Profiling is already running")
+
+        duration = call.data[ATTR_DURATION]
+        PROFILER.start()
+        _LOGGER.info("Profiling Ujin integration for %d seconds", duration)
+
+        async def async_finish(now: datetime) -> None:
+            """Stop profiling and write the results to the config directory."""
+            stats = PROFILER.stop()
+            if stats is None:
+                _LOGGER.warning("Nothing to profile, no update or message was handled")
+                return
+            name = f"ujin_profile_{now.strftime('%Y%m%d_%H%M%S')}"
+            prof_path = hass.config.path(f"{name}.prof")
+            summary_path = hass.config.path(f"{name}.txt")
+            await hass.async_add_executor_job(
+                write_profile, stats, prof_path, summary_path
+            )
+            _LOGGER.info("Wrote profile to %s and %s", prof_path, summary_path)
+
+        async_call_later(hass, duration, async_finish)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+    )
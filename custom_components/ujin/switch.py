@@ -8,9 +8,9 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .entity import UjinEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,8 +21,8 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Ujin switches from a config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
-    api = hass.data[DOMAIN][entry.entry_id]["api"]
+    coordinator = hass.data[DOMAIN].entries[entry.entry_id]["coordinator"]
+    api = hass.data[DOMAIN].entries[entry.entry_id]["api"]
 
     entities = []
     devices = coordinator.data
@@ -33,7 +33,7 @@ async def async_setup_entry(
         if controls and controls[0].get("type") == "switch":
             entities.append(
                 UjinSwitch(
-                    coordinator=coordinator,
+                    coordinator=coordinator.tier_for(device),
                     api=api,
                     device_data=device,
                 )
@@ -42,14 +42,13 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class UjinSwitch(CoordinatorEntity, SwitchEntity):
+class UjinSwitch(UjinEntity, SwitchEntity):
     """Representation of a Ujin Switch."""
 
     def __init__(self, coordinator, api, device_data: dict[str, Any]) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, device_data)
         self._api = api
-        self._device_data = device_data
         self._attr_unique_id = f"{device_data['id']}_{device_data['signal']}"
         self._attr_name = device_data["name"]
         # Initialize optimistic state from device data
@@ -57,27 +56,28 @@ class UjinSwitch(CoordinatorEntity, SwitchEntity):
         self._attr_is_on = controls[0].get("value", 0) == 1 if controls else False
         # Initialize icon from device data
         self._attr_icon = self._get_icon_for_device(device_data)
-
-    @property
-    def device_info(self):
-        """Return device info."""
-        return {
-            "identifiers": {(DOMAIN, self._device_data["id"])},
-            "name": self._device_data["device_name"],
-            "manufacturer": self._device_data.get("specification", "Ujin"),
-            "model": self._device_data.get("model_title", "Unknown"),
+        # Room, model and manufacturer are in the device registry, online
+        # status and local IP are separate diagnostic entities
+        self._static_attributes = {
+            "device_id": device_data["id"],
+            "signal": device_data["signal"],
+            "category": device_data.get("category_name", "Unknown"),
+            "socket_enabled": device_data.get("socket_enabled", False),
         }
 
     @property
     def available(self) -> bool:
-        """Return True if entity is available."""
-        for device in self.coordinator.data:
-            if (
-                device["id"] == self._device_data["id"]
-                and device["signal"] == self._device_data["signal"]
-            ):
-                return device.get("status") == "ok"
-        return False
+        """Return True if entity is available.
+
+        The state age only matters while cached data is served during an
+        outage; otherwise the last poll is authoritative.
+        """
+        device = self.device
+        if not super().available or device is None or device.get("status") != "ok":
+            return False
+        return not self.coordinator.serving_stale or self.coordinator.is_device_fresh(
+            device["id"], device["signal"]
+        )
 
     def _get_icon_for_device(self, device_data: dict[str, Any]) -> str:
         """Determine the icon for a device based on its properties."""
@@ -118,24 +118,19 @@ class UjinSwitch(CoordinatorEntity, SwitchEntity):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra state attributes."""
-        for device in self.coordinator.data:
-            if (
-                device["id"] == self._device_data["id"]
-                and device["signal"] == self._device_data["signal"]
-            ):
+        # Only shown while the state comes from the cache, so regular
+        # polls don't rewrite the attributes
+        if self.coordinator.serving_stale:
+            last_confirmed = self.coordinator.last_confirmed(
+                self._device_data["id"], self._device_data["signal"]
+            )
+            cache_updated = self.coordinator.cache.updated
+            if last_confirmed and cache_updated and last_confirmed <= cache_updated:
                 return {
-                    "device_id": device["id"],
-                    "signal": device["signal"],
-                    "status": device.get("status_title", "Unknown"),
-                    "room": device.get("room", {}).get("title", "Unknown"),
-                    "model": device.get("model", "Unknown"),
-                    "category": device.get("category_name", "Unknown"),
-                    "socket_enabled": device.get("socket_enabled", False),
-                    "local_ip": device.get("management", {})
-                    .get("local", {})
-                    .get("ip", "N/A"),
+                    **self._static_attributes,
+                    "last_confirmed": last_confirmed.isoformat(),
                 }
-        return {}
+        return self._static_attributes
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
@@ -183,16 +178,12 @@ class UjinSwitch(CoordinatorEntity, SwitchEntity):
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         # Update local state from real coordinator data (from polling or WebSocket)
-        for device in self.coordinator.data:
-            if (
-                device["id"] == self._device_data["id"]
-                and device["signal"] == self._device_data["signal"]
-            ):
-                controls = device.get("controls", [])
-                if controls:
-                    # Sync _attr_is_on with real device state
-                    self._attr_is_on = controls[0].get("value", 0) == 1
-                # Update icon if device data changed
-                self._attr_icon = self._get_icon_for_device(device)
-                break
+        device = self.device
+        if device is not None:
+            controls = device.get("controls", [])
+            if controls:
+                # Sync _attr_is_on with real device state
+                self._attr_is_on = controls[0].get("value", 0) == 1
+            # Update icon if device data changed
+            self._attr_icon = self._get_icon_for_device(device)
         self.async_write_ha_state()
@@ -0,0 +1,278 @@
+"""Device telemetry buffers and long-term statistics for Ujin Smart Home."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+import logging
+import time
+from typing import Any
+
+from homeassistant.const import (
+    CONCENTRATION_PARTS_PER_MILLION,
+    PERCENTAGE,
+    UnitOfTemperature,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, TELEMETRY_CAPACITY, TELEMETRY_HOURS_KEPT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Numeric device fields, with the unit of their statistics
+TELEMETRY_FIELDS = {
+    "co2": CONCENTRATION_PARTS_PER_MILLION,
+    "temperature": UnitOfTemperature.CELSIUS,
+    "humidity": PERCENTAGE,
+}
+# On/off metrics, imported as duty cycle in percent
+DUTY_METRICS = ("value", "online")
+HOUR = 3600  # seconds
+
+
+class TelemetryBuffer:
+    """Fixed-size ring buffer of (timestamp, value) samples.
+
+    Samples are stored only when the value changes; a value holds until
+    the next sample, so nothing is lost for step-like signals. A sample
+    overwritten by a newer one is first folded into the aggregates of
+    the hours it was in effect, so an hour stays complete however many
+    changes it had.
+    """
+
+    __slots__ = ("_times", "_values", "_next", "_count", "_last", "_hours", "_evictions")
+
+    def __init__(self, capacity: int = TELEMETRY_CAPACITY) -> None:
+        """Initialize the buffer."""
+        self._times = array("I", bytes(4 * capacity))  # epoch seconds
+        self._values = array("f", bytes(4 * capacity))
+        self._next = 0
+        self._count = 0
+        # Unrounded last value, stored values are single precision
+        self._last: float | None = None
+        # Hour start -> (first time, min, max, weighted sum) of evicted samples
+        self._hours: dict[int, tuple[int, float, float, float]] = {}
+        # Odd while an eviction is in progress, readers retry on change
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return self._count
+
+    @property
+    def last_value(self) -> float | None:
+        """Return the most recent value."""
+        return self._last
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Store a sample if the value changed."""
+        if value == self._last:
+            return
+        self._last = value
+        full = self._count == len(self._times)
+        if full:
+            self._evictions += 1
+            self._evict()
+        self._times[self._next] = int(timestamp)
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._times)
+        self._count = min(self._count + 1, len(self._times))
+        if full:
+            self._evictions += 1
+
+    def _evict(self) -> None:
+        """Fold the oldest sample into the aggregates of its hours."""
+        oldest = self._next
+        begin = self._times[oldest]
+        end = self._times[(oldest + 1) % len(self._times)]
+        value = self._values[oldest]
+        cutoff = end - end % HOUR - TELEMETRY_HOURS_KEPT * HOUR
+        for hour in [hour for hour in self._hours if hour < cutoff]:
+            del self._hours[hour]
+        begin = max(begin, cutoff)
+        hour = begin - begin % HOUR
+        while True:
+            finish = min(end, hour + HOUR)
+            known = self._hours.get(hour)
+            if known is None:
+                known = (begin, value, value, 0.0)
+            first, minimum, maximum, weighted = known
+            self._hours[hour] = (
+                first,
+                min(minimum, value),
+                max(maximum, value),
+                weighted + value * (finish - begin),
+            )
+            if finish >= end:
+                break
+            begin = hour = finish
+
+    def _ordered(self) -> tuple[array, array]:
+        """Return timestamps and values, oldest first."""
+        position, count = self._next, self._count
+        if count < len(self._times):
+            return self._times[:count], self._values[:count]
+        return (
+            self._times[position:] + self._times[:position],
+            self._values[position:] + self._values[:position],
+        )
+
+    def aggregate(self, start: int) -> tuple[float, float, float] | None:
+        """Return time-weighted (min, mean, max) over the hour from start.
+
+        None if no value was known during the hour. Safe to call from
+        another thread while samples are appended on the event loop.
+        """
+        while True:
+            evictions = self._evictions
+            if evictions % 2:
+                continue
+            times, values = self._ordered()
+            evicted = self._hours.get(start)
+            if evictions == self._evictions:
+                break
+
+        end = start + HOUR
+        period_start, minimum, maximum, weighted = evicted or (None, None, None, 0.0)
+        # Stored samples in effect from start, through the last one before end
+        first = max(bisect_right(times, start) - 1, 0)
+        last = bisect_left(times, end)
+        if last > first:
+            if period_start is None:
+                period_start = max(times[first], start)
+            for index in range(first, last):
+                begin = max(times[index], start)
+                finish = times[index + 1] if index + 1 < last else end
+                weighted += values[index] * (finish - begin)
+            in_effect = values[first:last]
+            low, high = min(in_effect), max(in_effect)
+            minimum = low if minimum is None else min(minimum, low)
+            maximum = high if maximum is None else max(maximum, high)
+        if period_start is None:
+            return None
+        return minimum, weighted / (end - period_start), maximum
+
+
+class UjinTelemetry:
+    """Telemetry buffers of every channel, imported hourly as statistics."""
+
+    def __init__(self) -> None:
+        """Initialize the telemetry store."""
+        # (device id, signal, metric) -> buffer
+        self._buffers: dict[tuple[str, str, str], TelemetryBuffer] = {}
+        # Statistics metadata, built once per series
+        self._metadata: dict[tuple[str, str, str], dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of buffered series."""
+        return len(self._buffers)
+
+    def _append(
+        self,
+        device: dict[str, Any],
+        metric: str,
+        timestamp: float,
+        value: float,
+    ) -> None:
+        """Append a sample to a series, creating it if needed."""
+        key = (device["id"], device["signal"], metric)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            # Metadata first, hourly_statistics may run in the executor
+            self._metadata[key] = _statistic_metadata(device, metric)
+            buffer = self._buffers[key] = TelemetryBuffer()
+        buffer.append(timestamp, value)
+
+    def record_device(self, device: dict[str, Any], timestamp: float | None = None) -> None:
+        """Record the numeric values of one channel."""
+        if timestamp is None:
+            timestamp = time.time()
+        if "status" in device:
+            self._append(device, "online", timestamp, float(device["status"] == "ok"))
+        controls = device.get("controls")
+        if controls and isinstance(controls[0].get("value"), (int, float)):
+            self._append(device, "value", timestamp, controls[0]["value"])
+        for field in TELEMETRY_FIELDS:
+            if isinstance(device.get(field), (int, float)):
+                self._append(device, field, timestamp, device[field])
+
+    def record(self, devices: list[dict[str, Any]]) -> None:
+        """Record the numeric values of all channels."""
+        timestamp = time.time()
+        for device in devices:
+            self.record_device(device, timestamp)
+
+    def hourly_statistics(
+        self, start: datetime
+    ) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+        """Return (metadata, statistic) of every series for one hour.
+
+        Safe to run in the executor while samples are being recorded.
+        """
+        period_start = int(start.timestamp())
+        statistics = []
+        # Series may be added meanwhile, iterate over a copy
+        for key, buffer in list(self._buffers.items()):
+            result = buffer.aggregate(period_start)
+            if result is None:
+                continue
+            minimum, mean, maximum = result
+            if key[2] in DUTY_METRICS:
+                minimum, mean, maximum = minimum * 100, mean * 100, maximum * 100
+            statistic = {"start": start, "min": minimum, "mean": mean, "max": maximum}
+            statistics.append((self._metadata[key], statistic))
+        return statistics
+
+    async def async_import_statistics(
+        self, hass: HomeAssistant, start: datetime
+    ) -> int:
+        """Import one hour of aggregates as external statistics.
+
+        Aggregation runs in the executor, only handing the statistics to
+        the recorder happens on the event loop. Returns the number of
+        imported series.
+        """
+        if "recorder" not in hass.config.components:
+            return 0
+        # Imported lazily, the recorder is optional
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        statistics = await hass.async_add_executor_job(
+            self.hourly_statistics, start
+        )
+        for metadata, statistic in statistics:
+            async_add_external_statistics(hass, metadata, [statistic])
+        _LOGGER.debug(
+            "Imported %d telemetry series for %s", len(statistics), start.isoformat()
+        )
+        return len(statistics)
+
+
+def _statistic_metadata(device: dict[str, Any], metric: str) -> dict[str, Any]:
+    """Return external statistics metadata of a channel metric."""
+    device_id, signal = device["id"], device["signal"]
+    name = f"{device.get('device_name', device_id)} {device.get('name', signal)}"
+    if metric in DUTY_METRICS:
+        unit = PERCENTAGE
+        name = f"{name} {metric} duty cycle"
+    else:
+        unit = TELEMETRY_FIELDS[metric]
+        name = f"{name} {metric}"
+    return {
+        "has_mean": True,
+        "has_sum": False,
+        "name": name,
+        "source": DOMAIN,
+        "statistic_id": f"{DOMAIN}:{slugify(f'{device_id}_{signal}_{metric}')}",
+        "unit_of_measurement": unit,
+    }
+
+
+def previous_hour(now: datetime) -> datetime:
+    """Return the start of the last complete hour."""
+    return dt_util.as_utc(now).replace(minute=0, second=0, microsecond=0) - timedelta(
+        hours=1
+    )
@@ -0,0 +1,101 @@
+"""Capture of Ujin API traffic for offline replay."""
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+REDACTED = "**REDACTED**"
+# Keys whose values must never end up in a capture
+SENSITIVE_KEYS = {
+    "token", "user_token", "dpr_user_token", "area_guid", "email", "phone", "code",
+}
+# Tokens passed in URLs, e.g. the WebSocket URL
+_URL_TOKEN = re.compile(r"(token=)[^&\s\"]+")
+
+# Stop buffering after this many records to bound memory use
+MAX_RECORDS = 100_000
+
+
+def redact(value: Any) -> Any:
+    """Return a copy of a payload with tokens and personal data removed."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in SENSITIVE_KEYS and item else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return _URL_TOKEN.sub(rf"\g<1>{REDACTED}", value)
+    return value
+
+
+class UjinTrafficRecorder:
+    """Buffer REST responses and WebSocket frames as they pass through.
+
+    Records are kept in memory while recording and written as JSON lines
+    by `dump`, which does blocking I/O and must run in an executor.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the recorder."""
+        self._start = time.monotonic()
+        self._records: list[dict[str, Any]] = []
+        self._dropped = 0
+
+    def _add(self, record: dict[str, Any]) -> None:
+        """Buffer a record."""
+        if len(self._records) >= MAX_RECORDS:
+            self._dropped += 1
+            return
+        record["t"] = round(time.monotonic() - self._start, 6)
+        self._records.append(record)
+
+    def record_rest(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None,
+        status: int,
+        elapsed: float,
+        response: Any,
+    ) -> None:
+        """Record a REST exchange."""
+        self._add({
+            "kind": "rest",
+            "method": method,
+            "endpoint": endpoint,
+            "params": redact(params or {}),
+            "status": status,
+            "elapsed": round(elapsed, 6),
+            "response": redact(response),
+        })
+
+    def record_ws(self, frame: str) -> None:
+        """Record a WebSocket text frame."""
+        try:
+            payload: Any = redact(json.loads(frame))
+        except ValueError:
+            payload = redact(frame)
+        self._add({"kind": "ws", "frame": payload})
+
+    @property
+    def count(self) -> int:
+        """Return the number of buffered records."""
+        return len(self._records)
+
+    def dump(self, path: str) -> int:
+        """Write buffered records as JSON lines, return how many."""
+        with open(path, "w", encoding="utf-8") as file:
+            for record in self._records:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if self._dropped:
+            _LOGGER.warning(
+                "Traffic capture was truncated, %d record(s) dropped", self._dropped
+            )
+        return len(self._records)
@@ -8,6 +8,10 @@ from typing import Any, Callable
 
 import aiohttp
 
+from .metrics import WebSocketMetrics
+from .profiler import PROFILER
+from .traffic import UjinTrafficRecorder
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -18,20 +22,26 @@ class UjinWebSocketClient:
         self,
         url: str,
         on_message: Callable[[dict[str, Any]], None],
+        session: aiohttp.ClientSession | None = None,
     ) -> None:
         """Initialize WebSocket client.
 
         Args:
             url: WebSocket URL to connect to
             on_message: Callback function for incoming messages
+            session: Shared session to use, a private one is created otherwise
         """
         self._url = url
         self._on_message = on_message
-        self._session: aiohttp.ClientSession | None = None
+        self._session = session
+        self._owns_session = session is None
         self._ws: aiohttp.ClientWebSocketResponse | None = None
         self._listen_task: asyncio.Task | None = None
         self._should_reconnect = True
         self._reconnect_delay = 5  # seconds
+        self.metrics = WebSocketMetrics()
+        # Set while a traffic capture is running
+        self.recorder: UjinTrafficRecorder | None = None
 
     async def connect(self) -> None:
         """Connect to WebSocket server."""
@@ -63,6 +73,12 @@ class UjinWebSocketClient:
         try:
             async for msg in self._ws:
                 if msg.type == aiohttp.WSMsgType.TEXT:
+                    self.metrics.record_message()
+                    if self.recorder:
+                        self.recorder.record_ws(msg.data)
+                    profiling = PROFILER.active
+                    if profiling:
+                        PROFILER.enter()
                     try:
                         data = json.loads(msg.data)
                         _LOGGER.debug("WebSocket message received: %s", data)
@@ -71,6 +87,9 @@ class UjinWebSocketClient:
                             self._on_message(data)
                     except json.JSONDecodeError as err:
                         _LOGGER.error("Failed to parse WebSocket message: %s", err)
+                    finally:
+                        if profiling:
+                            PROFILER.exit()
                 elif msg.type == aiohttp.WSMsgType.ERROR:
                     _LOGGER.error("WebSocket error: %s", self._ws.exception())
                     break
@@ -90,6 +109,7 @@ class UjinWebSocketClient:
             return
 
         _LOGGER.info("Scheduling WebSocket reconnect in %d seconds", self._reconnect_delay)
+        self.metrics.record_reconnect()
         await asyncio.sleep(self._reconnect_delay)
 
         if self._should_reconnect:
@@ -110,9 +130,9 @@ class UjinWebSocketClient:
             await self._ws.close()
             _LOGGER.info("WebSocket disconnected")
 
-        if self._session and not self._session.closed:
+        if self._owns_session and self._session and not self._session.closed:
             await self._session.close()
+            self._session = None
 
         self._ws = None
-        self._session = None
         self._listen_task = None
@@ -0,0 +1,207 @@
+"""Startup benchmark for the Ujin integration.
+
+Measures the integration's share of Home Assistant boot time:
+
+- import: time to import custom_components.ujin in a fresh interpreter,
+  with the Home Assistant modules every integration needs already loaded,
+  and which integration modules that pulled in
+- setup: wall time of setting up a config entry (async_setup_entry plus
+  the forwarded platforms) against tools/mock_server.py, the first run
+  including the import by the integration loader
+
+    python tools/bench_startup.py --devices 200 1000 --runs 5 --output startup.json
+
+Requires Home Assistant to be installed (pip install homeassistant).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from aiohttp.test_utils import TestServer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from mock_server import STATE_KEY, MockConfig, create_app  # noqa: E402
+
+DEFAULT_DEVICES = [20, 200, 1000]
+
+# Run in a fresh interpreter, prints the import time and new modules as JSON
+IMPORT_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+import aiohttp
+import homeassistant.config_entries
+import homeassistant.core
+import homeassistant.helpers.entity_platform
+import homeassistant.helpers.update_coordinator
+before = set(sys.modules)
+start = time.perf_counter()
+import custom_components.ujin
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(set(sys.modules) - before)}}))
+"""
+
+
+def _timings(samples: list[float]) -> dict[str, Any]:
+    """Summarize timing samples (seconds)."""
+    return {
+        "samples": len(samples),
+        "min_ms": min(samples) * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def bench_import(runs: int) -> dict[str, Any]:
+    """Benchmark importing the integration package."""
+    script = IMPORT_SCRIPT.format(root=str(ROOT))
+    # Warm up, so bytecode compilation is not measured; the bytecode must
+    # be written for that even if the environment disables it
+    env = {
+        key: value for key, value in os.environ.items()
+        if key != "PYTHONDONTWRITEBYTECODE"
+    }
+    subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, env=env
+    )
+
+    samples = []
+    modules: list[str] = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            check=True, capture_output=True, text=True, env=env,
+        )
+        report = json.loads(result.stdout)
+        samples.append(report["seconds"])
+        modules = report["modules"]
+
+    own = [module for module in modules if module.startswith("custom_components")]
+    return {
+        **_timings(samples),
+        "integration_modules": own,
+        "other_modules": len(modules) - len(own),
+    }
+
+
+async def _setup_once(url: str, token: str) -> tuple[float, int]:
+    """Set up one config entry in a new Home Assistant instance.
+
+    Returns the setup wall time and the number of created states.
+    """
+    from homeassistant import bootstrap, config_entries, loader
+    from homeassistant.core import HomeAssistant
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config.skip_pip = True
+        loader.async_setup(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await bootstrap.async_load_base_functionality(hass)
+
+        entry = config_entries.ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain="ujin",
+            title="Startup benchmark",
+            data={
+                "email": "bench@example.com",
+                "token": token,
+                "api_host": url,
+                "api_hosts": [url],
+            },
+            source=config_entries.SOURCE_USER,
+            options={},
+        )
+        start = time.perf_counter()
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        elapsed = time.perf_counter() - start
+        if entry.state is not config_entries.ConfigEntryState.LOADED:
+            raise RuntimeError(f"Setup failed: {entry.state} {entry.reason}")
+
+        states = len(hass.states.async_all())
+        await hass.async_stop(force=True)
+    return elapsed, states
+
+
+async def bench_setup(devices: int, runs: int) -> dict[str, Any]:
+    """Benchmark config entry setup against the mock server."""
+    app = create_app(MockConfig(devices=devices, seed=devices))
+    server = TestServer(app)
+    await server.start_server()
+    url = str(server.make_url("")).rstrip("/")
+    token = app[STATE_KEY].issue_token("ust-bench")
+
+    try:
+        samples = []
+        states = 0
+        for _ in range(runs):
+            elapsed, states = await _setup_once(url, token)
+            samples.append(elapsed)
+    finally:
+        await server.close()
+
+    return {
+        "first_ms": samples[0] * 1000,
+        "warm": _timings(samples[1:]) if len(samples) > 1 else None,
+        "states": states,
+    }
+
+
+async def run(devices: list[int], runs: int) -> dict[str, Any]:
+    """Run the startup benchmarks."""
+    print("Benchmarking import...", file=sys.stderr)
+    results: dict[str, Any] = {"import": bench_import(runs), "setup": {}}
+    for size in devices:
+        print(f"Benchmarking setup with {size} channels...", file=sys.stderr)
+        results["setup"][str(size)] = await bench_setup(size, runs)
+
+    manifest = json.loads(
+        (ROOT / "custom_components" / "ujin" / "manifest.json").read_text()
+    )
+    return {
+        "meta": {
+            "integration_version": manifest.get("version"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "devices": devices,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=DEFAULT_DEVICES,
+                        help="channels served by the mock server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.devices, args.runs))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""Benchmarks for the poll -> parse -> fan-out pipeline.
+
+Measures, for synthetic devices/main payloads of increasing size:
+
+- parse: JSON decoding and get_devices() flattening of total_list, and
+  get_devices() on an unchanged response
+- loop: event loop lag while get_devices() parses inline and in the
+  executor
+- fanout: UjinSwitch._handle_coordinator_update, available and
+  extra_state_attributes for every switch after one coordinator update
+- icons: icon classification of every channel
+- websocket: UjinWebSocketClient._listen message handling throughput
+
+Results are printed (or written with --output) as JSON so runs can be
+compared between releases:
+
+    python tools/benchmark.py --sizes 10 100 1000 --output bench.json
+
+Requires Home Assistant to be installed (pip install homeassistant).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from mock_server import devices_main_payload, generate_devices  # noqa: E402
+
+from custom_components.ujin.api import UjinApiClient  # noqa: E402
+from custom_components.ujin.switch import UjinSwitch  # noqa: E402
+from custom_components.ujin.websocket import UjinWebSocketClient  # noqa: E402
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+
+def _summary(samples: list[float], items: int) -> dict[str, Any]:
+    """Summarize timing samples (seconds) for `items` processed per sample."""
+    median = statistics.median(samples)
+    return {
+        "items": items,
+        "samples": len(samples),
+        "min_ms": min(samples) * 1000,
+        "median_ms": median * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "per_item_us": median / items * 1_000_000 if items else None,
+        "items_per_second": items / median if median else None,
+    }
+
+
+def _measure(
+    func: Callable[[], Any], items: int, min_time: float, max_samples: int
+) -> dict[str, Any]:
+    """Time a function until min_time has passed or max_samples were taken."""
+    samples: list[float] = []
+    while len(samples) < max_samples and (sum(samples) < min_time or len(samples) < 3):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+        if samples[-1] > min_time:
+            break
+    return _summary(samples, items)
+
+
+async def _measure_async(
+    func: Callable[[], Awaitable[Any]], items: int, min_time: float, max_samples: int
+) -> dict[str, Any]:
+    """Async variant of _measure."""
+    samples: list[float] = []
+    while len(samples) < max_samples and (sum(samples) < min_time or len(samples) < 3):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+        if samples[-1] > min_time:
+            break
+    return _summary(samples, items)
+
+
+class _PayloadClient(UjinApiClient):
+    """API client answering devices/main from memory."""
+
+    def __init__(self, body: bytes) -> None:
+        super().__init__(email="bench@example.com")
+        self._token = "bench"
+        self._body = body
+
+    async def _fetch(
+        self, method: str, endpoint: str, **kwargs: Any
+    ) -> tuple[int, dict[str, str], bytes, float]:
+        return 200, {}, self._body, 0.0
+
+    async def get_devices_parsed(self) -> list[dict[str, Any]]:
+        """Return devices, always decoding the response."""
+        self._devices_snapshot = None
+        return await self.get_devices()
+
+
+class _BenchCoordinator:
+    """Minimal coordinator stand-in holding device data."""
+
+    def __init__(self, devices: list[dict[str, Any]]) -> None:
+        self.data = devices
+        self.serving_stale = False
+        self.cache = SimpleNamespace(updated=None)
+        self._index = {(device["id"], device["signal"]): device for device in devices}
+
+    def get_device(self, device_id: str, signal: str) -> dict[str, Any] | None:
+        return self._index.get((device_id, signal))
+
+    def is_device_fresh(self, device_id: str, signal: str) -> bool:
+        return True
+
+    def last_confirmed(self, device_id: str, signal: str) -> None:
+        return None
+
+
+def _make_switches(coordinator: _BenchCoordinator) -> list[UjinSwitch]:
+    """Create a switch for every channel without a running Home Assistant."""
+    switches = []
+    for device in coordinator.data:
+        switch = UjinSwitch(coordinator=coordinator, api=None, device_data=device)
+        switch.async_write_ha_state = lambda: None
+        switches.append(switch)
+    return switches
+
+
+async def bench_parse(size: int, min_time: float, max_samples: int) -> dict[str, Any]:
+    """Benchmark JSON decoding and total_list flattening."""
+    payload = devices_main_payload(generate_devices(size, seed=size))
+    raw = json.dumps(payload, ensure_ascii=False)
+    client = _PayloadClient(raw.encode())
+
+    return {
+        "payload_bytes": len(raw.encode()),
+        "decode": _measure(lambda: json.loads(raw), size, min_time, max_samples),
+        "get_devices": await _measure_async(
+            client.get_devices_parsed, size, min_time, max_samples
+        ),
+        # Same response again, answered from the previous snapshot
+        "get_devices_unchanged": await _measure_async(
+            client.get_devices, size, min_time, max_samples
+        ),
+    }
+
+
+async def _loop_lag(func: Callable[[], Awaitable[Any]], runs: int) -> dict[str, Any]:
+    """Measure event loop lag while awaiting func runs times.
+
+    A ticker asks to be woken every millisecond; lag is how late it was.
+    """
+    lags: list[float] = []
+    running = True
+
+    async def ticker() -> None:
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    lags.clear()
+    for _ in range(runs):
+        await func()
+        # Room for the ticker between polls, like network I/O would leave
+        await asyncio.sleep(0.01)
+    running = False
+    await task
+
+    lags.sort()
+    return {
+        "ticks": len(lags),
+        "max_lag_ms": lags[-1] * 1000,
+        "p95_lag_ms": lags[int(len(lags) * 0.95)] * 1000,
+        "median_lag_ms": statistics.median(lags) * 1000,
+    }
+
+
+async def bench_loop(size: int, min_time: float, max_samples: int) -> dict[str, Any]:
+    """Benchmark event loop lag of get_devices, parsing inline and in the executor."""
+    raw = json.dumps(
+        devices_main_payload(generate_devices(size, seed=size)), ensure_ascii=False
+    ).encode()
+    runs = max(3, min(max_samples, 10))
+    results = {}
+    for mode, threshold in (("inline", len(raw)), ("executor", 0)):
+        client = _PayloadClient(raw)
+        client.parse_threshold = threshold
+        results[mode] = await _loop_lag(client.get_devices_parsed, runs)
+        results[mode]["max_blocking_ms"] = client.parse_metrics.max_blocking * 1000
+    return results
+
+
+def bench_fanout(size: int, min_time: float, max_samples: int) -> dict[str, Any]:
+    """Benchmark one coordinator update fanned out to every switch."""
+    coordinator = _BenchCoordinator(generate_devices(size, seed=size))
+    switches = _make_switches(coordinator)
+
+    def update() -> None:
+        for switch in switches:
+            switch._handle_coordinator_update()
+
+    def available() -> None:
+        for switch in switches:
+            switch.available
+
+    def attributes() -> None:
+        for switch in switches:
+            switch.extra_state_attributes
+
+    return {
+        "entities": len(switches),
+        "handle_coordinator_update": _measure(update, size, min_time, max_samples),
+        "available": _measure(available, size, min_time, max_samples),
+        "extra_state_attributes": _measure(attributes, size, min_time, max_samples),
+    }
+
+
+def bench_icons(size: int, min_time: float, max_samples: int) -> dict[str, Any]:
+    """Benchmark icon classification."""
+    devices = generate_devices(size, seed=size)
+    switch = _make_switches(_BenchCoordinator(devices[:1]))[0]
+
+    def classify() -> None:
+        for device in devices:
+            switch._get_icon_for_device(device)
+
+    return _measure(classify, size, min_time, max_samples)
+
+
+class _ReplayWebSocket:
+    """Fake aiohttp WebSocket yielding prepared text frames."""
+
+    def __init__(self, frames: list[str]) -> None:
+        self._frames = frames
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for frame in self._frames:
+            yield SimpleNamespace(type=aiohttp.WSMsgType.TEXT, data=frame)
+
+    def exception(self) -> None:
+        return None
+
+
+async def bench_websocket(size: int, min_time: float, max_samples: int) -> dict[str, Any]:
+    """Benchmark WebSocket frame decoding and dispatch."""
+    frames = [
+        json.dumps({"command": "device->update", "data": device}, ensure_ascii=False)
+        for device in generate_devices(size, seed=size)
+    ]
+    received = 0
+
+    def on_message(data: dict[str, Any]) -> None:
+        nonlocal received
+        received += 1
+
+    client = UjinWebSocketClient(url="ws://bench", on_message=on_message)
+    client._should_reconnect = False
+
+    async def listen() -> None:
+        client._ws = _ReplayWebSocket(frames)
+        await client._listen()
+
+    result = await _measure_async(listen, size, min_time, max_samples)
+    result["received"] = received
+    return result
+
+
+async def run(sizes: list[int], min_time: float, max_samples: int) -> dict[str, Any]:
+    """Run every benchmark for every size."""
+    results: dict[str, dict[str, Any]] = {
+        "parse": {}, "loop": {}, "fanout": {}, "icons": {}, "websocket": {},
+    }
+    for size in sizes:
+        print(f"Benchmarking {size} channels...", file=sys.stderr)
+        results["parse"][str(size)] = await bench_parse(size, min_time, max_samples)
+        results["loop"][str(size)] = await bench_loop(size, min_time, max_samples)
+        results["fanout"][str(size)] = bench_fanout(size, min_time, max_samples)
+        results["icons"][str(size)] = bench_icons(size, min_time, max_samples)
+        results["websocket"][str(size)] = await bench_websocket(size, min_time, max_samples)
+
+    manifest = json.loads(
+        (ROOT / "custom_components" / "ujin" / "manifest.json").read_text()
+    )
+    return {
+        "meta": {
+            "integration_version": manifest.get("version"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="seconds to sample each measurement for")
+    parser.add_argument("--max-samples", type=int, default=50)
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.sizes, args.min_time, args.max_samples))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
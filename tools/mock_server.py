@@ -0,0 +1,509 @@
+"""Local stand-in for the Ujin cloud API (REST + WebSocket).
+
+Implements the endpoints used by the integration so that UjinApiClient and
+UjinWebSocketClient can be exercised without api-product.mysmartflat.ru:
+
+    python tools/mock_server.py --devices 2000 --latency 80 --error-rate 0.05
+
+Point the client at it with UjinApiClient(email, base_url="http://127.0.0.1:8765").
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import secrets
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import WSMsgType, web
+
+_LOGGER = logging.getLogger("ujin.mock")
+
+API_AUTH_EMAIL_SEND = "/api/v1/auth/code/email/send/"
+API_AUTH_EMAIL_VERIFY = "/api/v1/auth/code/email/auth/"
+API_AUTH_USER = "/api/v1/auth/user/"
+API_PROFILE_OBJECTS = "/api/v4/mobile/profile/objects/select/"
+API_DEVICES_MAIN = "/api/devices/main/"
+API_DEVICES_WSS = "/api/devices/wss/"
+API_SEND_SIGNAL = "/api/apartment/send-signal/"
+API_APP_INIT = "/api/v1/app/init/"
+API_AUTOSCRIPTS_LIST = "/api/autoscripts/list/"
+API_AUTOSCRIPTS_RUN = "/api/autoscripts/run/"
+WS_PATH = "/ws"
+
+AUTH_CODE = "1234"
+AREA_GUID = "00000000-0000-4000-8000-000000000001"
+
+# (model, model_title, svg, category, signals)
+DEVICE_MODELS = [
+    ("dinrelay_m4", "Коммутатор на дин-рейку Ujin Connect-din", "light",
+     "Управление", ["rele1", "rele2", "rele3", "rele4"]),
+    ("ujin-zdm-m2", "Диммер Ujin Connect-dim", "light",
+     "Освещение", ["rele1", "rele2"]),
+    ("ujin-zld-m1", "Контроллер протечки Ujin Aqua", "waterController",
+     "Вода", ["rele-w"]),
+]
+ROOMS = ["Прихожая", "Кухня", "Гостиная", "Спальня", "Ванная", "Детская"]
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the mock server."""
+
+    devices: int = 20  # number of channels (total_list entries)
+    latency: float = 0.0  # base response latency, ms
+    jitter: float = 0.0  # random extra latency, ms
+    error_rate: float = 0.0  # share of requests answered with HTTP 500
+    api_error_rate: float = 0.0  # share answered with error != 0
+    token_ttl: float = 0.0  # seconds until issued tokens expire, 0 = never
+    change_rate: float = 0.0  # random device changes pushed per second
+    ws_disconnect_after: float = 0.0  # seconds before the server drops a WS, 0 = never
+    seed: int | None = None
+    ws_base_url: str | None = None  # advertised WebSocket URL base
+    etag: bool = False  # send ETags on devices/main, answer 304 when matched
+    local: bool = True  # answer sapfir-unicast datagrams, False = cloud only
+    local_host: str = "127.0.0.1"  # address the UDP responder binds to
+
+
+def generate_devices(count: int, seed: int | None = None) -> list[dict[str, Any]]:
+    """Generate `count` channels shaped like the devices/main total_list."""
+    rng = random.Random(seed)
+    devices: list[dict[str, Any]] = []
+    serial = 5_000_000
+
+    while len(devices) < count:
+        model, model_title, svg, category, signals = rng.choice(DEVICE_MODELS)
+        serial += 1
+        room_id = rng.randrange(len(ROOMS))
+        for index, signal in enumerate(signals, start=1):
+            if len(devices) >= count:
+                break
+            devices.append({
+                "id": str(serial),
+                "signal": signal,
+                "device_name": f"{model_title} {serial}",
+                "name": f"Канал {index}" if len(signals) > 1 else "Кран",
+                "channels": len(signals),
+                "icon": "https://cndslctl.mysmartflat.ru/img/devices/new/lighting.png",
+                "svg": svg,
+                "model": model,
+                "model_title": model_title,
+                "category_name": category,
+                "specification": "Ujin",
+                "room": {"title": ROOMS[room_id], "id": 100_000 + room_id},
+                "status": "ok",
+                "status_title": "Онлайн",
+                "socket_enabled": False,
+                "controls": [
+                    {"type": "switch", "value": rng.randint(0, 1), "readonly": 0}
+                ],
+                "management": {
+                    "remote": {"ip": "203.0.113.1", "protocol": "sapfir"},
+                    "local": {
+                        "available": True,
+                        "protocol": "sapfir-unicast",
+                        "ip": f"10.10.{(serial >> 8) & 0xFF}.{serial & 0xFF}",
+                        "token": f"{serial:08x}",
+                        "port": 30300,
+                    },
+                },
+            })
+    return devices
+
+
+def generate_autoscripts(devices: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Generate autoscripts switching many channels at once, by id."""
+    lights = [device for device in devices if device["svg"] == "light"]
+    return {
+        "1": {
+            "title": "Уйти из дома",
+            "actions": [(device, 0) for device in lights],
+        },
+        "2": {
+            "title": "Весь свет",
+            "actions": [(device, 1) for device in lights],
+        },
+    }
+
+
+def devices_main_payload(devices: list[dict[str, Any]]) -> dict[str, Any]:
+    """Wrap channels in the devices/main response envelope."""
+    return {
+        "command": "devices->main",
+        "error": 0,
+        "message": "",
+        "data": {"devices": [{"type": "total_list", "data": devices}]},
+    }
+
+
+@dataclass
+class MockState:
+    """Mutable state of the mock server."""
+
+    config: MockConfig
+    devices: list[dict[str, Any]] = field(default_factory=list)
+    autoscripts: dict[str, dict[str, Any]] = field(default_factory=dict)
+    tokens: dict[str, float] = field(default_factory=dict)
+    websockets: set[web.WebSocketResponse] = field(default_factory=set)
+    requests: dict[str, int] = field(default_factory=dict)
+    rng: random.Random = field(default_factory=random.Random)
+
+    def issue_token(self, prefix: str) -> str:
+        """Issue a new token."""
+        token = f"{prefix}-{secrets.token_hex(16)}"
+        self.tokens[token] = time.monotonic()
+        return token
+
+    def token_valid(self, token: str | None) -> bool:
+        """Return True if a token was issued and has not expired."""
+        issued = self.tokens.get(token or "")
+        if issued is None:
+            return False
+        ttl = self.config.token_ttl
+        return not ttl or time.monotonic() - issued < ttl
+
+    def find(self, serial: str, signal: str) -> dict[str, Any] | None:
+        """Find a channel by serial number and signal."""
+        for device in self.devices:
+            if device["id"] == serial and device["signal"] == signal:
+                return device
+        return None
+
+    def find_local(self, token: str, signal: str) -> dict[str, Any] | None:
+        """Find a channel by its local token and signal."""
+        for device in self.devices:
+            local = device["management"]["local"]
+            if local["token"] == token and device["signal"] == signal:
+                return device
+        return None
+
+    async def push(self, device: dict[str, Any]) -> None:
+        """Push a device change to every connected WebSocket."""
+        message = json.dumps({"command": "device->update", "data": device})
+        for ws in list(self.websockets):
+            try:
+                await ws.send_str(message)
+            except ConnectionError:
+                self.websockets.discard(ws)
+
+
+STATE_KEY = web.AppKey("state", MockState)
+
+
+def _ok(command: str, data: Any) -> web.Response:
+    return web.json_response(
+        {"command": command, "error": 0, "message": "", "data": data}
+    )
+
+
+def _error(command: str, message: str) -> web.Response:
+    return web.json_response(
+        {"command": command, "error": 1, "message": message, "data": {}}
+    )
+
+
+@web.middleware
+async def _behaviour_middleware(request: web.Request, handler):
+    """Apply latency, error injection and request counting."""
+    state = request.app[STATE_KEY]
+    config = state.config
+    state.requests[request.path] = state.requests.get(request.path, 0) + 1
+
+    if request.path == WS_PATH:
+        return await handler(request)
+
+    delay = config.latency + state.rng.random() * config.jitter
+    if delay:
+        await asyncio.sleep(delay / 1000)
+    if config.error_rate and state.rng.random() < config.error_rate:
+        return web.Response(status=500, text="Injected failure")
+    if config.api_error_rate and state.rng.random() < config.api_error_rate:
+        return _error("mock", "Injected API error")
+    return await handler(request)
+
+
+def _require_token(request: web.Request) -> str | None:
+    """Return the request token if it is valid."""
+    token = request.query.get("token")
+    if request.app[STATE_KEY].token_valid(token):
+        return token
+    return None
+
+
+async def _auth_send(request: web.Request) -> web.Response:
+    body = await request.json()
+    if not body.get("email"):
+        return _error("email->send", "Email is required")
+    return _ok("email->send", {"success": True, "time": 299})
+
+
+async def _auth_verify(request: web.Request) -> web.Response:
+    body = await request.json()
+    if body.get("code") != AUTH_CODE:
+        return _error("email->auth", "Invalid code")
+    token = request.app[STATE_KEY].issue_token("ust-1")
+    return _ok("email->auth", {"token": token})
+
+
+async def _auth_user(request: web.Request) -> web.Response:
+    if not _require_token(request):
+        return _error("auth->user", "Invalid token")
+    return _ok("auth->user", {
+        "user": {"id": "1", "name": "Mock", "email": "mock@example.com"}
+    })
+
+
+async def _profile_objects(request: web.Request) -> web.Response:
+    if not _require_token(request):
+        return _error("profile->objects", "Invalid token")
+    user_token = request.app[STATE_KEY].issue_token("ust-apartment")
+    return web.json_response({
+        "data": [{
+            "title": "Mock complex",
+            "items": [{
+                "title": "Квартира 1",
+                "area_guid": AREA_GUID,
+                "user_token": user_token,
+            }],
+        }],
+    })
+
+
+async def _devices_main(request: web.Request) -> web.Response:
+    if not _require_token(request):
+        return _error("devices->main", "Token expired")
+    state = request.app[STATE_KEY]
+    payload = devices_main_payload(state.devices)
+    if not state.config.etag:
+        return web.json_response(payload)
+
+    body = json.dumps(payload).encode()
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    if request.headers.get("If-None-Match") == etag:
+        return web.Response(status=304, headers={"ETag": etag})
+    return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+
+async def _send_signal(request: web.Request) -> web.Response:
+    state = request.app[STATE_KEY]
+    if not _require_token(request):
+        return _error("apartment->send-signal", "Token expired")
+
+    device = state.find(
+        request.query.get("serialnumber", ""), request.query.get("signal", "")
+    )
+    if device is None:
+        return _error("apartment->send-signal", "Device not found")
+
+    device["controls"][0]["value"] = int(request.query.get("state", 0))
+    await state.push(device)
+    return _ok("apartment->send-signal", {})
+
+
+async def _autoscripts_list(request: web.Request) -> web.Response:
+    if not _require_token(request):
+        return _error("autoscripts->list", "Token expired")
+    autoscripts = request.app[STATE_KEY].autoscripts
+    return _ok("autoscripts->list", {"autoscripts": [
+        {"id": autoscript_id, "title": autoscript["title"], "active": True}
+        for autoscript_id, autoscript in autoscripts.items()
+    ]})
+
+
+async def _autoscripts_run(request: web.Request) -> web.Response:
+    state = request.app[STATE_KEY]
+    if not _require_token(request):
+        return _error("autoscripts->run", "Token expired")
+
+    autoscript = state.autoscripts.get(request.query.get("id", ""))
+    if autoscript is None:
+        return _error("autoscripts->run", "Autoscript not found")
+
+    for device, value in autoscript["actions"]:
+        device["controls"][0]["value"] = value
+        await state.push(device)
+    return _ok("autoscripts->run", {})
+
+
+async def _devices_wss(request: web.Request) -> web.Response:
+    if not _require_token(request):
+        return _error("devices->wss", "Token expired")
+    base = request.app[STATE_KEY].config.ws_base_url or f"ws://{request.host}"
+    return _ok("devices->wss", {"wss": [f"{base}{WS_PATH}"]})
+
+
+async def _app_init(request: web.Request) -> web.Response:
+    return _ok("app->init", {})
+
+
+async def _websocket(request: web.Request) -> web.WebSocketResponse:
+    state = request.app[STATE_KEY]
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+    state.websockets.add(ws)
+
+    drop_after = state.config.ws_disconnect_after
+    try:
+        async with asyncio.timeout(drop_after or None):
+            async for msg in ws:
+                if msg.type == WSMsgType.ERROR:
+                    break
+    except TimeoutError:
+        _LOGGER.info("Dropping WebSocket after %.0f s", drop_after)
+    finally:
+        state.websockets.discard(ws)
+        await ws.close()
+    return ws
+
+
+async def _random_changes(app: web.Application):
+    """Background task flipping random channels at the configured rate."""
+    state = app[STATE_KEY]
+
+    async def run() -> None:
+        while True:
+            await asyncio.sleep(1 / state.config.change_rate)
+            if not state.devices:
+                continue
+            device = state.rng.choice(state.devices)
+            control = device["controls"][0]
+            control["value"] = 1 - control["value"]
+            await state.push(device)
+
+    task = asyncio.create_task(run()) if state.config.change_rate else None
+    yield
+    if task:
+        task.cancel()
+
+
+class _LocalResponder(asyncio.DatagramProtocol):
+    """Answer sapfir-unicast datagrams on behalf of every mock device."""
+
+    def __init__(self, state: MockState) -> None:
+        """Initialize the responder."""
+        self._state = state
+        self._transport: asyncio.DatagramTransport | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Store the transport used for replies."""
+        self._transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Answer a get-state or send-signal request."""
+        state = self._state
+        state.requests["udp"] = state.requests.get("udp", 0) + 1
+        try:
+            message = json.loads(data)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return
+
+        reply: dict[str, Any] = {"id": message.get("id"), "error": 0}
+        device = state.find_local(message.get("token", ""), message.get("signal", ""))
+        if device is None:
+            reply.update(error=1, message="Device not found")
+        elif message.get("command") == "get-state":
+            reply["state"] = device["controls"][0]["value"]
+        elif message.get("command") == "send-signal":
+            device["controls"][0]["value"] = int(message.get("state", 0))
+            asyncio.get_running_loop().create_task(state.push(device))
+        else:
+            reply.update(error=1, message="Unknown command")
+        self._transport.sendto(json.dumps(reply).encode(), addr)
+
+
+async def _local_transport(app: web.Application):
+    """Serve the LAN transport and advertise it in management.local.
+
+    Generated devices advertise addresses that do not exist; they are
+    pointed at the responder here, or marked unavailable when the LAN
+    transport is disabled.
+    """
+    state = app[STATE_KEY]
+    if not state.config.local:
+        for device in state.devices:
+            device["management"]["local"]["available"] = False
+        yield
+        return
+
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: _LocalResponder(state), local_addr=(state.config.local_host, 0)
+    )
+    host, port = transport.get_extra_info("sockname")[:2]
+    for device in state.devices:
+        device["management"]["local"].update(ip=host, port=port)
+    _LOGGER.info("Answering sapfir-unicast on %s:%d", host, port)
+    yield
+    transport.close()
+
+
+def create_app(config: MockConfig | None = None) -> web.Application:
+    """Create the mock server application."""
+    config = config or MockConfig()
+    state = MockState(
+        config=config,
+        devices=generate_devices(config.devices, config.seed),
+        rng=random.Random(config.seed),
+    )
+    state.autoscripts = generate_autoscripts(state.devices)
+
+    app = web.Application(middlewares=[_behaviour_middleware])
+    app[STATE_KEY] = state
+    app.router.add_post(API_AUTH_EMAIL_SEND, _auth_send)
+    app.router.add_post(API_AUTH_EMAIL_VERIFY, _auth_verify)
+    app.router.add_get(API_AUTH_USER, _auth_user)
+    app.router.add_get(API_PROFILE_OBJECTS, _profile_objects)
+    app.router.add_get(API_DEVICES_MAIN, _devices_main)
+    app.router.add_get(API_SEND_SIGNAL, _send_signal)
+    app.router.add_get(API_DEVICES_WSS, _devices_wss)
+    app.router.add_get(API_APP_INIT, _app_init)
+    app.router.add_get(API_AUTOSCRIPTS_LIST, _autoscripts_list)
+    app.router.add_get(API_AUTOSCRIPTS_RUN, _autoscripts_run)
+    app.router.add_get(WS_PATH, _websocket)
+    app.cleanup_ctx.append(_random_changes)
+    app.cleanup_ctx.append(_local_transport)
+    return app
+
+
+def main() -> None:
+    """Run the mock server from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--devices", type=int, default=20, help="number of channels")
+    parser.add_argument("--latency", type=float, default=0.0, help="response latency, ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency, ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of HTTP 500 responses")
+    parser.add_argument("--api-error-rate", type=float, default=0.0, help="share of error != 0 responses")
+    parser.add_argument("--token-ttl", type=float, default=0.0, help="token lifetime, s (0 = forever)")
+    parser.add_argument("--change-rate", type=float, default=0.0, help="pushed changes per second")
+    parser.add_argument("--ws-disconnect-after", type=float, default=0.0, help="drop WebSockets after, s")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--etag", action="store_true", help="send ETags on devices/main")
+    parser.add_argument("--no-local", action="store_true", help="do not answer on the LAN transport")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = MockConfig(
+        devices=args.devices,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        api_error_rate=args.api_error_rate,
+        token_ttl=args.token_ttl,
+        change_rate=args.change_rate,
+        ws_disconnect_after=args.ws_disconnect_after,
+        seed=args.seed,
+        etag=args.etag,
+        local=not args.no_local,
+    )
+    _LOGGER.info("Auth code for any email: %s", AUTH_CODE)
+    web.run_app(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
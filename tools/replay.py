@@ -0,0 +1,212 @@
+"""Replay captured Ujin traffic through the integration.
+
+Feeds a capture written by the `ujin.record_traffic` service back into the
+coordinator and switch entities, offline and deterministically:
+
+    python tools/replay.py ujin_traffic_20260101_120000.jsonl --speed 10
+
+WebSocket frames are injected at their recorded offsets divided by
+--speed (0 = as fast as possible); REST calls are answered with the most
+recent recorded response for the same endpoint. Reports event-to-state
+latency (frame injected -> all switches updated) and CPU time per frame
+as JSON. The refresh debouncer's cooldown is set to zero, so latency is
+what the coordinator itself adds. Frames whose refresh changed data are
+counted as changed; the others update no switch and are counted as
+unchanged.
+
+Requires Home Assistant to be installed (pip install homeassistant).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.ujin.api import UjinApiClient  # noqa: E402
+from custom_components.ujin.const import DEFAULT_STALE_BUDGET  # noqa: E402
+from custom_components.ujin.coordinator import UjinDataUpdateCoordinator  # noqa: E402
+from custom_components.ujin.switch import UjinSwitch  # noqa: E402
+
+
+def load_capture(path: Path) -> list[dict[str, Any]]:
+    """Load a JSON lines capture, ordered by time."""
+    with path.open(encoding="utf-8") as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    return sorted(records, key=lambda record: record["t"])
+
+
+class ReplayClock:
+    """Position in the capture timeline."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+
+class ReplayApiClient(UjinApiClient):
+    """API client answering from recorded REST responses."""
+
+    def __init__(self, records: list[dict[str, Any]], clock: ReplayClock) -> None:
+        super().__init__(email="replay@example.com")
+        self._token = "replay"
+        self._clock = clock
+        self._responses: dict[str, tuple[list[float], list[Any]]] = {}
+        for record in records:
+            if record["kind"] != "rest":
+                continue
+            times, responses = self._responses.setdefault(record["endpoint"], ([], []))
+            times.append(record["t"])
+            responses.append(record["response"])
+
+    async def _fetch(
+        self, method: str, endpoint: str, **kwargs: Any
+    ) -> tuple[int, dict[str, str], bytes, float]:
+        if endpoint not in self._responses:
+            raise RuntimeError(f"No recorded response for {endpoint}")
+        times, responses = self._responses[endpoint]
+        index = max(bisect.bisect_right(times, self._clock.now) - 1, 0)
+        return 200, {}, json.dumps(responses[index]).encode(), 0.0
+
+    async def get_local_states(self, devices: list[dict[str, Any]]) -> dict:
+        # LAN traffic is not captured, never try to reach real devices
+        return {}
+
+
+async def replay(
+    records: list[dict[str, Any]], speed: float, drain_timeout: float
+) -> dict[str, Any]:
+    """Replay a capture and measure latency and CPU use."""
+    clock = ReplayClock()
+    frames = [
+        record for record in records
+        if record["kind"] == "ws" and isinstance(record["frame"], dict)
+    ]
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        coordinator = UjinDataUpdateCoordinator(
+            hass, ReplayApiClient(records, clock), stale_budget=DEFAULT_STALE_BUDGET
+        )
+        await coordinator.async_refresh()
+        if not coordinator.last_update_success:
+            raise RuntimeError("Capture has no usable devices/main response")
+
+        switches = []
+        for device in coordinator.data:
+            controls = device.get("controls", [])
+            if controls and controls[0].get("type") == "switch":
+                switch = UjinSwitch(coordinator=coordinator, api=None, device_data=device)
+                switch.async_write_ha_state = lambda: None
+                coordinator.async_add_listener(switch._handle_coordinator_update)
+                switches.append(switch)
+
+        # The default 10 s cooldown would dominate every latency
+        coordinator._debounced_refresh.cooldown = 0
+
+        # Frames injected but not yet picked up by a refresh, and frames
+        # covered by the refresh in flight
+        pending: list[float] = []
+        covered: list[float] = []
+        latencies: list[float] = []
+
+        # Registered last, so it runs once every switch has been updated
+        def on_state_written() -> None:
+            now = time.perf_counter()
+            latencies.extend(now - injected for injected in covered)
+            covered.clear()
+
+        coordinator.async_add_listener(on_state_written)
+
+        # Refreshes returning unchanged data notify no listener
+        unchanged: list[float] = []
+        update_data = coordinator._async_update_data
+
+        def on_refresh_done() -> None:
+            unchanged.extend(covered)
+            covered.clear()
+
+        async def tracked_update_data() -> list[dict[str, Any]]:
+            covered.extend(pending)
+            pending.clear()
+            data = await update_data()
+            # Runs after the coordinator has notified its listeners
+            asyncio.get_running_loop().call_soon(on_refresh_done)
+            return data
+
+        coordinator._async_update_data = tracked_update_data
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for frame in frames:
+            if speed:
+                delay = frame["t"] / speed - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            clock.now = frame["t"]
+            pending.append(time.perf_counter())
+            coordinator.handle_websocket_message(frame["frame"])
+            await asyncio.sleep(0)
+
+        deadline = time.perf_counter() + drain_timeout
+        while (pending or covered) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+        await coordinator.async_shutdown()
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        "frames": len(frames),
+        "switches": len(switches),
+        "speed": speed or "unlimited",
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "cpu_per_frame_us": cpu / len(frames) * 1_000_000 if frames else None,
+        "changed_frames": len(latencies),
+        "unchanged_frames": len(unchanged),
+        "unresolved_frames": len(pending) + len(covered),
+        "snapshot": coordinator.api.snapshot_metrics.as_dict(),
+        "latency_ms": {
+            "min": latencies_ms[0],
+            "median": statistics.median(latencies_ms),
+            "p95": latencies_ms[int(len(latencies_ms) * 0.95)],
+            "max": latencies_ms[-1],
+        } if latencies_ms else None,
+    }
+
+
+def main() -> None:
+    """Run the replay from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path)
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed multiplier, 0 = unlimited")
+    parser.add_argument("--drain-timeout", type=float, default=30.0,
+                        help="seconds to wait for outstanding refreshes")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        replay(load_capture(args.capture), args.speed, args.drain_timeout)
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()